@@ -8,15 +8,29 @@ Network monitoring functionality including ping and traceroute operations.
 import time
 import threading
 import queue
-from collections import deque
+import subprocess
+from collections import deque, namedtuple
 from datetime import datetime
 
-from utils.ping import ping_host
-from utils.traceroute import perform_traceroute
-from utils.ip_lookup import resolve_hostname
+import numpy as np
+
+from utils.ping import ping_host, close_pool, set_socket_registry
+from utils.traceroute import iter_traceroute
+from utils.ip_lookup import resolve_ip_async
 from core.statistics import calculate_statistics
 from concurrent.futures import ThreadPoolExecutor
 
+# Column layout of the structured array returned by get_current_array()
+HOP_DTYPE = np.dtype([
+    ('hop', 'i4'),
+    ('current', 'f4'),
+    ('avg', 'f4'),
+    ('loss', 'f4'),
+])
+
+# Immutable view of one monitoring round, shared by all UI consumers
+Snapshot = namedtuple('Snapshot', ['seq', 'hops', 'array', 'timestamp'])
+
 class EndlessPingMonitor:
     """Manages network monitoring operations and data collection"""
     
@@ -33,6 +47,13 @@ class EndlessPingMonitor:
         # Increase max_points to store 24 hours of data at 1-second intervals (86400 seconds per day)
         self.history_max_points = 86400  # Store up to 24 hours of data at 1s intervals
         
+        # Latest published snapshot and its sequence number
+        self.snapshot = None
+        self.snapshot_seq = 0
+        
+        # Optional callable invoked (from the monitoring thread) with each new snapshot
+        self.snapshot_callback = None
+        
         # Queue for async operations
         self.data_queue = queue.Queue()
     
@@ -42,6 +63,7 @@ class EndlessPingMonitor:
         # Reset data when target changes
         self.current_hops = []
         self.history = {}
+        self.snapshot = None
     
     def set_interval(self, interval_seconds):
         """Set the monitoring interval in seconds"""
@@ -68,66 +90,101 @@ class EndlessPingMonitor:
         """Main monitoring loop that runs in a separate thread"""
         # First, perform traceroute to get the path
         self._perform_initial_traceroute()
+        self._publish_snapshot()
         
-        # Then start continuous ping monitoring
-        while not self.stop_event.is_set() and self.running:
-            start_time = time.time()
-            
-            # Perform ping on each hop
-            self._ping_all_hops()
-            
-            # Calculate statistics
-            self._update_statistics()
-            
-            # Wait for the next interval
-            elapsed = time.time() - start_time
-            sleep_time = max(0, self.interval - elapsed)
-            if sleep_time > 0:
-                time.sleep(sleep_time)
+        # Then start continuous ping monitoring; the ping threads live for the
+        # whole run so each keeps its ICMP socket open between rounds, and their
+        # sockets are closed when this run ends (and not those of a newer run)
+        sockets = []
+        with ThreadPoolExecutor(max_workers=32, thread_name_prefix='ping',
+                                initializer=set_socket_registry, initargs=(sockets,)) as executor:
+            while not self.stop_event.is_set() and self.running:
+                start_time = time.time()
+                
+                # Perform ping on each hop
+                self._ping_all_hops(executor)
+                
+                # Calculate statistics
+                self._update_statistics()
+                
+                # Hand the finished round to the UI
+                self._publish_snapshot()
+                
+                # Wait for the next interval, waking immediately if paused
+                elapsed = time.time() - start_time
+                sleep_time = max(0, self.interval - elapsed)
+                if sleep_time > 0:
+                    self.stop_event.wait(sleep_time)
+        close_pool(sockets)
     
     def _perform_initial_traceroute(self):
         """Perform initial traceroute to discover the path"""
         if not self.target:
             return
             
-        # Perform traceroute
-        traceroute_result = perform_traceroute(self.target)
-        
         # Initialize hops list
         self.current_hops = []
-        for hop_num, hop_data in enumerate(traceroute_result, 1):
-            if hop_data.get('ip') == '*':  # Skip timeouts
-                continue
+        
+        # Perform traceroute, adding each hop as soon as it is reported
+        try:
+            for hop_num, hop_data in enumerate(iter_traceroute(self.target), 1):
+                if self.stop_event.is_set():
+                    break
+                if hop_data.get('ip') == '*':  # Skip timeouts
+                    continue
                 
-            # Resolve hostname if needed
-            if not hop_data.get('hostname'):
-                try:
-                    hostname = resolve_hostname(hop_data.get('ip'))
-                    hop_data['hostname'] = hostname
-                except:
-                    hop_data['hostname'] = ''
-            
-            # Create hop entry
-            hop_entry = {
-                'hop': hop_num,
-                'ip': hop_data.get('ip', ''),
-                'hostname': hop_data.get('hostname', ''),
-                'count': 0,
-                'current': 0,
-                'min': float('inf'),
-                'max': 0,
-                'avg': 0,
-                'loss': 0,
-                'jitter': 0,
-                'error_type': None,
-                'timestamps': []
-            }
-            
-            self.current_hops.append(hop_entry)
-            self.history[hop_num] = deque(maxlen=self.history_max_points)
+                self._add_hop(hop_num, hop_data)
+                
+                # Let the UI show the path while it is being discovered
+                self._publish_snapshot()
+        except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
+            # Keep the hops found before the traceroute failed
+            pass
+    
+    def _add_hop(self, hop_num, hop_data):
+        """Add a hop found by the traceroute to the monitored path
+        
+        Args:
+            hop_num: Position of the hop in the path
+            hop_data: Hop dictionary reported by the traceroute
+        """
+        # Create hop entry
+        hop_entry = {
+            'hop': hop_num,
+            'ip': hop_data.get('ip', ''),
+            'hostname': hop_data.get('hostname', ''),
+            'count': 0,
+            'current': 0,
+            'min': float('inf'),
+            'max': 0,
+            'avg': 0,
+            'loss': 0,
+            'jitter': 0,
+            'error_type': None,
+            'timestamps': []
+        }
+        
+        self.current_hops.append(hop_entry)
+        self.history[hop_num] = deque(maxlen=self.history_max_points)
+        
+        # Resolve the hostname in the background; it shows up in the next snapshot
+        if not hop_entry['hostname'] and hop_entry['ip']:
+            resolve_ip_async(hop_entry['ip']).add_done_callback(
+                lambda future, hop=hop_entry: self._set_hop_hostname(hop, future))
+    
+    def _set_hop_hostname(self, hop, future):
+        """Store the result of a background reverse lookup in a hop entry"""
+        try:
+            hop['hostname'] = future.result()
+        except Exception:
+            hop['hostname'] = ''
 
-    def _ping_all_hops(self):
-        """Ping all hops in the current path in parallel"""
+    def _ping_all_hops(self, executor):
+        """Ping all hops in the current path in parallel
+        
+        Args:
+            executor: Thread pool that runs the pings
+        """
         timestamp = datetime.now()
         
         def ping_and_process(hop):
@@ -166,17 +223,16 @@ class EndlessPingMonitor:
             
             return hop
         
-        # Use a thread pool to ping all hops in parallel
-        with ThreadPoolExecutor(max_workers=min(32, len(self.current_hops))) as executor:
-            # Submit all ping tasks and process results as they complete
-            future_to_hop = {executor.submit(ping_and_process, hop): hop for hop in self.current_hops}
-            
-            # Wait for all tasks to complete (optional, depending on your needs)
-            for future in future_to_hop:
-                try:
-                    future.result()
-                except Exception as exc:
-                    print(f'Hop generated an exception: {exc}')
+        # Use the thread pool to ping all hops in parallel
+        # Submit all ping tasks and process results as they complete
+        future_to_hop = {executor.submit(ping_and_process, hop): hop for hop in self.current_hops}
+        
+        # Wait for all tasks to complete (optional, depending on your needs)
+        for future in future_to_hop:
+            try:
+                future.result()
+            except Exception as exc:
+                print(f'Hop generated an exception: {exc}')
     
     def _update_statistics(self):
         """Update statistics for all hops"""
@@ -188,10 +244,29 @@ class EndlessPingMonitor:
                 hop['loss'] = stats['loss']
                 hop['jitter'] = stats['jitter']
     
+    def _publish_snapshot(self):
+        """Publish an immutable snapshot of the current hop data"""
+        self.snapshot_seq += 1
+        self.snapshot = Snapshot(
+            seq=self.snapshot_seq,
+            hops=tuple(dict(hop) for hop in self.current_hops),
+            array=self.get_current_array(),
+            timestamp=time.monotonic()  # Same clock as the time series graph
+        )
+        if self.snapshot_callback is not None:
+            self.snapshot_callback(self.snapshot)
+    
     def get_current_data(self):
         """Get the current monitoring data"""
         return self.current_hops.copy()
     
+    def get_current_array(self):
+        """Get the current hop metrics as a structured numpy array (one row per hop)"""
+        return np.array(
+            [(hop['hop'], hop['current'], hop['avg'], hop['loss']) for hop in self.current_hops],
+            dtype=HOP_DTYPE
+        )
+    
     def get_history_data(self, hop_num=None):
         """Get historical data for visualization"""
         if hop_num is not None and hop_num in self.history:
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Fixed-capacity numpy ring buffer for streaming samples.
+"""
+
+import numpy as np
+
+class RingBuffer:
+    """
+    Ring buffer whose stored samples are always available as a contiguous view.
+
+    The backing array is 2 * capacity long and every sample is written twice
+    (at head and head + capacity), so the latest len(buffer) samples are the
+    slice ending at head + capacity and can be read without copying.
+    With rows set, the buffer holds one ring per row, all sharing the same head.
+    """
+
+    def __init__(self, capacity, dtype=np.float64, fill=np.nan, rows=None):
+        """
+        Args:
+            capacity: Maximum number of samples kept
+            dtype: numpy dtype of the stored values
+            fill: Value of slots that have not been written
+            rows: Number of rows for a 2D buffer, or None for a 1D buffer
+        """
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self.fill = fill
+        shape = (2 * capacity,) if rows is None else (rows, 2 * capacity)
+        self._buf = np.full(shape, fill, dtype=self.dtype)
+        self._head = 0   # Next write position in [0, capacity)
+        self._count = 0  # Number of valid samples
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def rows(self):
+        """Number of rows of a 2D buffer"""
+        return self._buf.shape[0]
+
+    def append(self, value):
+        """
+        Append one sample
+
+        Args:
+            value: The value to store (one per row for a 2D buffer)
+        """
+        head = self._head
+        self._buf[..., head] = value
+        self._buf[..., head + self.capacity] = value
+        self._head = (head + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def append_chunk(self, values):
+        """
+        Append a chunk of samples with at most two slice writes per copy
+
+        Args:
+            values: Array of samples along the last axis, oldest first;
+                only the newest capacity samples are kept
+        """
+        values = np.asarray(values)[..., -self.capacity:]
+        count = values.shape[-1]
+        head = self._head
+        size = self.capacity
+        buf = self._buf
+
+        first = min(count, size - head)
+        buf[..., head:head + first] = values[..., :first]
+        buf[..., head + size:head + size + first] = values[..., :first]
+
+        # Wrap the remainder around to the start of the ring
+        rest = count - first
+        if rest:
+            buf[..., :rest] = values[..., first:]
+            buf[..., size:size + rest] = values[..., first:]
+
+        self._head = (head + count) % size
+        self._count = min(self._count + count, size)
+
+    def view(self):
+        """Return the stored samples, oldest first, as a zero-copy view"""
+        end = self._head + self.capacity
+        return self._buf[..., end - self._count:end]
+
+    def first(self):
+        """Return the oldest stored sample"""
+        return self._buf[..., self._head + self.capacity - self._count]
+
+    def last(self):
+        """Return the newest stored sample"""
+        return self._buf[..., self._head + self.capacity - 1]
+
+    def grow_rows(self, rows):
+        """
+        Enlarge a 2D buffer to at least the given number of rows, keeping the stored data
+
+        Args:
+            rows: Minimum number of rows required
+        """
+        if rows <= self.rows:
+            return
+        buf = np.full((rows, 2 * self.capacity), self.fill, dtype=self.dtype)
+        buf[:self.rows] = self._buf
+        self._buf = buf
+
+    def clear(self, rows=None):
+        """
+        Drop all samples
+
+        Args:
+            rows: New number of rows for a 2D buffer (defaults to the current number)
+        """
+        if rows is not None and self._buf.ndim == 2:
+            self._buf = np.full((rows, 2 * self.capacity), self.fill, dtype=self.dtype)
+        else:
+            self._buf.fill(self.fill)
+        self._head = 0
+        self._count = 0
@@ -9,6 +9,7 @@ A desktop application to monitor and visualize network latency.
 import sys
 import logging
 from PyQt6.QtWidgets import QApplication
+import pyqtgraph as pg
 from ui.main_window import MainWindow
 
 # Configure logging
@@ -32,6 +33,9 @@ def main():
     app.setApplicationName("Endless Ping")
     app.setOrganizationName("NetworkTools")
     
+    # Plot without antialiasing; the latency curves don't need it and it is CPU-bound
+    pg.setConfigOptions(antialias=False)
+    
     # Apply dark style
     try:
         import qdarkstyle
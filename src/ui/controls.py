@@ -21,6 +21,38 @@ class ControlPanel(QWidget):
     save_clicked = pyqtSignal()
     interval_changed = pyqtSignal(int)
     
+    # Shared by every instance so the stylesheet string is built once
+    _STYLESHEET = """
+        QWidget {
+            background-color: #2b2b2b;
+            color: #ffffff;
+        }
+        QLineEdit {
+            background-color: #3c3f41;
+            border: 1px solid #555555;
+            color: #ffffff;
+            padding: 4px;
+        }
+        QPushButton {
+            background-color: #3c3f41;
+            border: 1px solid #555555;
+            color: #ffffff;
+            padding: 6px;
+        }
+        QPushButton:hover {
+            background-color: #4c4f51;
+        }
+        QComboBox {
+            background-color: #3c3f41;
+            border: 1px solid #555555;
+            color: #ffffff;
+            padding: 4px;
+        }
+        QLabel {
+            color: #ffffff;
+        }
+    """
+    
     def __init__(self, network_monitor):
         super().__init__()
         
@@ -188,35 +220,4 @@ class ControlPanel(QWidget):
 
     def apply_styles(self):
         """Apply custom styles to the control panel"""
-        self.setStyleSheet(
-            """
-            QWidget {
-                background-color: #2b2b2b;
-                color: #ffffff;
-            }
-            QLineEdit {
-                background-color: #3c3f41;
-                border: 1px solid #555555;
-                color: #ffffff;
-                padding: 4px;
-            }
-            QPushButton {
-                background-color: #3c3f41;
-                border: 1px solid #555555;
-                color: #ffffff;
-                padding: 6px;
-            }
-            QPushButton:hover {
-                background-color: #4c4f51;
-            }
-            QComboBox {
-                background-color: #3c3f41;
-                border: 1px solid #555555;
-                color: #ffffff;
-                padding: 4px;
-            }
-            QLabel {
-                color: #ffffff;
-            }
-            """
-        )
\ No newline at end of file
+        self.setStyleSheet(self._STYLESHEET)
\ No newline at end of file
@@ -17,6 +17,24 @@ class HopDataGrid(QTableWidget):
     # Signal emitted when a row is selected, passing the hop number
     row_selected = pyqtSignal(int)
     
+    # Shared by every instance so the stylesheet string is built once
+    _STYLESHEET = """
+        QTableWidget {
+            background-color: #2b2b2b;
+            color: #ffffff;
+            gridline-color: #555555;
+        }
+        QHeaderView::section {
+            background-color: #3c3f41;
+            color: #ffffff;
+            border: 1px solid #555555;
+        }
+        QTableWidget::item {
+            border: none;
+            padding: 4px;
+        }
+    """
+    
     def __init__(self):
         super().__init__()
         
@@ -82,39 +100,49 @@ class HopDataGrid(QTableWidget):
         
         # Update each row
         for row, hop in enumerate(hop_data):
-            self.set_cell_value(row, 0, str(hop['hop']))
-            self.set_cell_value(row, 1, str(hop['count']))
-            self.set_cell_value(row, 2, hop['ip'])
-            self.set_cell_value(row, 3, hop['hostname'])
-            
-            # Format latency values
-            avg = "-" if hop['avg'] == 0 else f"{hop['avg']:.1f}"
-            min_val = "-" if hop['min'] == float('inf') else f"{hop['min']:.1f}"
-            
-            # Show error message for "No route to host"
-            if hop.get('error_type') == "no_route":
-                cur = "No route"
-            else:
-                cur = "-" if hop['current'] == 0 else f"{hop['current']:.1f}"
-            
-            self.set_cell_value(row, 4, avg)
-            self.set_cell_value(row, 5, min_val)
-            self.set_cell_value(row, 6, cur)
-            
-            # Format packet loss
-            loss = f"{hop['loss']:.1f}"
-            self.set_cell_value(row, 7, loss)
-            
-            # Format jitter
-            jitter = f"{hop['jitter']:.1f}"
-            self.set_cell_value(row, 8, jitter)
-            
-            # Apply color based on current latency, loss, and error type
-            self.color_row(row, hop['current'], hop['loss'], hop.get('error_type'))
+            self.update_hop_row(row, hop)
         
         # Unblock signals
         self.blockSignals(False)
     
+    def update_hop_row(self, row, hop):
+        """
+        Update a single table row with new hop data
+        
+        Args:
+            row: Row index
+            hop: Dictionary containing hop information
+        """
+        self.set_cell_value(row, 0, str(hop['hop']))
+        self.set_cell_value(row, 1, str(hop['count']))
+        self.set_cell_value(row, 2, hop['ip'])
+        self.set_cell_value(row, 3, hop['hostname'])
+        
+        # Format latency values
+        avg = "-" if hop['avg'] == 0 else f"{hop['avg']:.1f}"
+        min_val = "-" if hop['min'] == float('inf') else f"{hop['min']:.1f}"
+        
+        # Show error message for "No route to host"
+        if hop.get('error_type') == "no_route":
+            cur = "No route"
+        else:
+            cur = "-" if hop['current'] == 0 else f"{hop['current']:.1f}"
+        
+        self.set_cell_value(row, 4, avg)
+        self.set_cell_value(row, 5, min_val)
+        self.set_cell_value(row, 6, cur)
+        
+        # Format packet loss
+        loss = f"{hop['loss']:.1f}"
+        self.set_cell_value(row, 7, loss)
+        
+        # Format jitter
+        jitter = f"{hop['jitter']:.1f}"
+        self.set_cell_value(row, 8, jitter)
+        
+        # Apply color based on current latency, loss, and error type
+        self.color_row(row, hop['current'], hop['loss'], hop.get('error_type'))
+    
     def set_cell_value(self, row, col, value):
         """Set cell value, creating a new item if needed"""
         item = self.item(row, col)
@@ -164,24 +192,7 @@ class HopDataGrid(QTableWidget):
     
     def apply_styles(self):
         """Apply custom styles to the data grid"""
-        self.setStyleSheet(
-            """
-            QTableWidget {
-                background-color: #2b2b2b;
-                color: #ffffff;
-                gridline-color: #555555;
-            }
-            QHeaderView::section {
-                background-color: #3c3f41;
-                color: #ffffff;
-                border: 1px solid #555555;
-            }
-            QTableWidget::item {
-                border: none;
-                padding: 4px;
-            }
-            """
-        )
+        self.setStyleSheet(self._STYLESHEET)
     
     def on_selection_changed(self):
         """Handle selection changes in the table"""
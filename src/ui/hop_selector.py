@@ -11,27 +11,37 @@ from PyQt6.QtWidgets import (
     QGroupBox, QFrame, QHBoxLayout
 )
 from PyQt6.QtCore import Qt, pyqtSignal
-from PyQt6.QtGui import QColor, QPainter, QBrush, QPen
+from PyQt6.QtGui import QColor, QPainter, QPen, QPixmap
+
+from ui.timeseries_graph import HOP_COLORS
 
 # Configure logger for this module
 logger = logging.getLogger('endless_ping.hop_selector')
 
-class ColorIndicator(QFrame):
+# Cache of pre-rendered color swatches, keyed by color string
+_SWATCH_CACHE = {}
+
+def _get_swatch(color, size=12):
+    """Return a cached pixmap of a bordered color square"""
+    pixmap = _SWATCH_CACHE.get(color)
+    if pixmap is None:
+        pixmap = QPixmap(size, size)
+        pixmap.fill(QColor(color))
+        painter = QPainter(pixmap)
+        painter.setPen(QPen(Qt.GlobalColor.black, 1))
+        painter.drawRect(0, 0, size - 1, size - 1)
+        painter.end()
+        _SWATCH_CACHE[color] = pixmap
+    return pixmap
+
+class ColorIndicator(QLabel):
     """A simple colored square to indicate hop color"""
     
     def __init__(self, color):
         super().__init__()
         self.color = QColor(color)
-        self.setMinimumSize(12, 12)
-        self.setMaximumSize(12, 12)
-        self.setFrameShape(QFrame.Shape.Box)
-        
-    def paintEvent(self, event):
-        """Paint the color indicator"""
-        painter = QPainter(self)
-        painter.setBrush(QBrush(self.color))
-        painter.setPen(QPen(Qt.GlobalColor.black, 1))
-        painter.drawRect(0, 0, self.width()-1, self.height()-1)
+        self.setFixedSize(12, 12)
+        self.setPixmap(_get_swatch(color))
 
 class HopSelector(QWidget):
     """Component that allows users to select which hops are visible in the graph"""
@@ -54,19 +64,8 @@ class HopSelector(QWidget):
         # Configure layout
         self.setup_ui()
         
-        # Color palette (must match the one in TimeSeriesGraph)
-        self.colors = [
-            '#d9534f',  # Soft red
-            '#5cb85c',  # Soft green
-            '#5bc0de',  # Soft blue
-            '#f0ad4e',  # Soft amber
-            '#a87dc9',  # Soft purple
-            '#20c997',  # Soft teal
-            '#fd7e14',  # Soft orange
-            '#6c757d',  # Soft gray
-            '#e83e8c',  # Soft pink
-            '#17a2b8',  # Soft cyan
-        ]
+        # Color palette shared with TimeSeriesGraph
+        self.colors = HOP_COLORS
         
         # Flag for final hop only mode
         self.final_hop_only_mode = False
@@ -342,6 +341,35 @@ class HopSelector(QWidget):
                 # Update "Select All" checkbox if needed
                 self.update_select_all_state()
             
+    def set_visible_hops(self, visible_hops):
+        """Bring all hop checkboxes in line with a set of visible hops
+        
+        Only checkboxes whose state differs are touched, and the "Select All"
+        state is recomputed once at the end.
+        
+        Args:
+            visible_hops: Set of hop numbers that should be checked
+        """
+        if self.final_hop_only_mode:
+            return
+            
+        changed = [
+            (hop_num, checkbox) for hop_num, checkbox in self.hop_checkboxes.items()
+            if checkbox.isChecked() != (hop_num in visible_hops)
+        ]
+        if not changed:
+            return
+            
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Hop visibility changes: %s", [(hop_num, hop_num in visible_hops) for hop_num, _ in changed])
+            
+        for hop_num, checkbox in changed:
+            checkbox.blockSignals(True)
+            checkbox.setChecked(hop_num in visible_hops)
+            checkbox.blockSignals(False)
+            
+        self.update_select_all_state()
+            
     def highlight_hop(self, hop_num):
         """Temporarily highlight a hop in the list
         
@@ -7,29 +7,26 @@ Bar graph visualization for latency by hop.
 
 import pyqtgraph as pg
 import numpy as np
-from PyQt6.QtCore import QTimer
 from PyQt6.QtGui import QColor
 from PyQt6.QtWidgets import QGraphicsRectItem  # Add this import
 
+from core.network import HOP_DTYPE
+
 class LatencyBarGraph(pg.PlotWidget):
     """Horizontal bar graph showing latency by hop"""
     
     def __init__(self):
         super().__init__()
         
-        # Data storage
-        self.hop_data = []
+        # Data storage (structured array, one row per hop)
+        self.hop_data = np.empty(0, dtype=HOP_DTYPE)
         
         # Configure plot properties
         self.setup_plot()
         
         # Create bar graph item
         self.bars = None
-        
-        # Set up refresh timer
-        self.timer = QTimer()
-        self.timer.timeout.connect(self.refresh_plot)
-        self.timer.start(100)  # Refresh every 100ms
+        self._brush_cache = {}  # Dict of {color: QBrush}
         
         self.apply_styles()
         
@@ -64,58 +61,84 @@ class LatencyBarGraph(pg.PlotWidget):
         self.plotItem.getAxis('left').setTextPen('#ffffff')
         self.plotItem.getAxis('bottom').setTextPen('#ffffff')
         
+    def _get_brush(self, color):
+        """Return a cached brush for the given color"""
+        brush = self._brush_cache.get(color)
+        if brush is None:
+            brush = pg.mkBrush(color)
+            self._brush_cache[color] = brush
+        return brush
+        
     def update_data(self, hop_data):
         """
         Update the graph with new hop data
         
         Args:
-            hop_data: List of dictionaries containing hop information
+            hop_data: Structured numpy array of hop metrics (see core.network.HOP_DTYPE)
+        """
+        self.hop_data = hop_data
+        
+        # Redraw only when new data arrives; Qt schedules the repaint of the changed items
+        self.refresh_plot()
+        
+    def update_bars(self, hop_data, indices):
+        """
+        Update the graph when only some hops' latencies have changed
+        
+        Args:
+            hop_data: Structured numpy array of hop metrics (see core.network.HOP_DTYPE)
+            indices: Row indices of the hops whose latency changed
         """
         self.hop_data = hop_data
+        self.refresh_plot(indices)
         
-    def refresh_plot(self):
-        """Refresh the plot with current data"""
-        if not self.hop_data:
+    def refresh_plot(self, indices=None):
+        """Refresh the plot with current data
+        
+        Args:
+            indices: Optional row indices to redraw; all bars are redrawn if None
+        """
+        if len(self.hop_data) == 0:
             return
 
-        # Extract latency and hop numbers
-        hops = [hop['hop'] for hop in self.hop_data]
-        latencies = [hop['current'] if hop['current'] > 0 else 0 for hop in self.hop_data]
-
-        # Convert to numpy arrays for plotting
-        y = np.array(hops)
-        x = np.array(latencies)
+        # Extract latency and hop numbers as contiguous columns
+        y = self.hop_data['hop']
+        x = np.where(self.hop_data['current'] > 0, self.hop_data['current'], 0)
+        latencies = x.tolist()
 
         # Generate colors based on latency values
-        colors = []
-        for latency in latencies:
-            if latency == 0:
-                colors.append('#888888')  # Gray for no data
-            elif latency > 100:
-                colors.append('#ff6060')  # Red for high latency
-            elif latency > 50:
-                colors.append('#ffcc44')  # Yellow for medium latency
-            else:
-                colors.append('#60ff60')  # Green for low latency
+        colors = np.select(
+            [x == 0, x > 100, x > 50],
+            ['#888888', '#ff6060', '#ffcc44'],  # Gray for no data, red for high, yellow for medium
+            default='#60ff60'  # Green for low latency
+        ).tolist()
 
-        # Remove old bar graph if it exists
-        if self.bars is not None:
-            for bar in self.bars:
-                self.plotItem.removeItem(bar)
-
-        # Create new bars
-        self.bars = []
         bar_width = 0.6
-        for i, (latency, color) in enumerate(zip(latencies, colors)):
-            bar = QGraphicsRectItem(0, i + 1 - bar_width / 2, latency, bar_width)
-            bar.setBrush(pg.mkBrush(color))
-            self.plotItem.addItem(bar)
-            self.bars.append(bar)
+        if self.bars is not None and len(self.bars) == len(latencies):
+            # Hop count unchanged: update geometry of the existing bars in place
+            if indices is None:
+                indices = range(len(self.bars))
+            for i in indices:
+                self.bars[i].setRect(0, i + 1 - bar_width / 2, latencies[i], bar_width)
+                self.bars[i].setBrush(self._get_brush(colors[i]))
+        else:
+            # Remove old bar graph if it exists
+            if self.bars is not None:
+                for bar in self.bars:
+                    self.plotItem.removeItem(bar)
+
+            # Create new bars
+            self.bars = []
+            for i, (latency, color) in enumerate(zip(latencies, colors)):
+                bar = QGraphicsRectItem(0, i + 1 - bar_width / 2, latency, bar_width)
+                bar.setBrush(self._get_brush(color))
+                self.plotItem.addItem(bar)
+                self.bars.append(bar)
 
         # Adjust y-axis range
-        max_hop = max(y) if y.size > 0 else 10
+        max_hop = int(y.max()) if y.size > 0 else 10
         self.plotItem.setYRange(0, max_hop + 1)
 
         # Adjust x-axis range dynamically based on data
-        max_latency = max(x) if x.size > 0 else 150
+        max_latency = float(x.max()) if x.size > 0 else 150
         self.plotItem.setXRange(0, max(150, max_latency * 1.1))
\ No newline at end of file
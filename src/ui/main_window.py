@@ -6,11 +6,14 @@ Main window for the network monitoring application.
 """
 
 import logging
+from bisect import bisect_left
+
+import numpy as np
 from PyQt6.QtWidgets import (
     QMainWindow, QWidget, QVBoxLayout, QSplitter, QSizePolicy,
     QHBoxLayout, QFrame
 )
-from PyQt6.QtCore import Qt, QSettings, QTimer, QEvent, QPoint
+from PyQt6.QtCore import Qt, QSettings, QTimer, QEvent, QPoint, QSignalBlocker
 from PyQt6.QtGui import QCursor
 
 from ui.controls import ControlPanel
@@ -20,6 +23,7 @@ from ui.timeseries_graph import TimeSeriesGraph
 from ui.time_window_controls import TimeWindowControls
 from ui.hop_selector import HopSelector
 from ui.timeseries_tooltip import TimeSeriesToolTip
+from ui.monitor_bridge import MonitorBridge
 from core.network import EndlessPingMonitor
 
 # Configure logger for this module
@@ -37,20 +41,49 @@ class MainWindow(QMainWindow):
         
         # Initialize settings
         self.settings = QSettings()
+        self._settings_dirty = {}  # Pending {key: value} writes, flushed on close
         
         # Create the network monitor
         self.network_monitor = EndlessPingMonitor()
+        self.monitoring_active = False
+        self.update_interval = 2500  # Monitoring interval in ms
         
         # Setup UI
         self.setup_ui()
         
-        # Create timer for updates
-        self.update_timer = QTimer(self)
-        self.update_timer.timeout.connect(self.update_data)
+        # Receive snapshots from the monitoring thread as they are published
+        self.monitor_bridge = MonitorBridge(self.network_monitor, self)
+        self._connections = [
+            self.monitor_bridge.data_ready.connect(self.queue_snapshot, Qt.ConnectionType.QueuedConnection)
+        ]
+        
+        # Coalesce snapshots so the widgets repaint at most ui_refresh_hz times per second
+        self._pending_snapshot = None
+        self._last_snapshot = None  # Last snapshot pushed to the widgets, for diffing
+        refresh_hz = max(1, self.settings.value("ui_refresh_hz", 4, type=int))
+        self.paint_timer = QTimer(self)
+        self.paint_timer.setSingleShot(True)
+        self.paint_timer.setTimerType(Qt.TimerType.CoarseTimer)
+        self.paint_timer.setInterval(1000 // refresh_hz)
+        self._connections.append(self.paint_timer.timeout.connect(self.flush_pending_snapshot))
         
         # Create tooltip for time series graph
         self.time_series_tooltip = TimeSeriesToolTip()
         
+        # Coalesce hover updates to roughly one per display frame
+        self._tooltip_pending = None
+        self._tooltip_timer = QTimer(self)
+        self._tooltip_timer.setSingleShot(True)
+        self._tooltip_timer.setInterval(16)
+        self._connections.append(self._tooltip_timer.timeout.connect(self._apply_tooltip_update))
+        
+        # Coalesce pan/zoom range updates to at most one per frame
+        self._pending_range = None
+        self._range_debounce = QTimer(self)
+        self._range_debounce.setSingleShot(True)
+        self._range_debounce.setInterval(16)
+        self._connections.append(self._range_debounce.timeout.connect(self._apply_range_update))
+        
         # Reference to highlighted hop
         self.highlighted_hop = None
         
@@ -88,9 +121,11 @@ class MainWindow(QMainWindow):
         self.hop_data_grid = HopDataGrid()
         hop_splitter.addWidget(self.hop_data_grid)
         
-        # Add latency bar graph
-        self.latency_bar_graph = LatencyBarGraph()
-        hop_splitter.addWidget(self.latency_bar_graph)
+        # Reserve space for the latency bar graph; it is built on first start
+        self.latency_bar_graph = None
+        self._bar_graph_placeholder = QFrame()
+        hop_splitter.addWidget(self._bar_graph_placeholder)
+        self._hop_splitter = hop_splitter
         
         # Set splitter sizes (70% for table, 30% for bar graph)
         hop_splitter.setSizes([600, 300])
@@ -112,9 +147,11 @@ class MainWindow(QMainWindow):
         ts_splitter = QSplitter(Qt.Orientation.Horizontal)
         ts_splitter.setChildrenCollapsible(False)
         
-        # Add time series graph
-        self.time_series_graph = TimeSeriesGraph()
-        ts_splitter.addWidget(self.time_series_graph)
+        # Reserve space for the time series graph; it is built on first start
+        self.time_series_graph = None
+        self._time_series_placeholder = QFrame()
+        ts_splitter.addWidget(self._time_series_placeholder)
+        self._ts_splitter = ts_splitter
         
         # Add hop selector panel
         self.hop_selector = HopSelector()
@@ -128,24 +165,17 @@ class MainWindow(QMainWindow):
         # Set reference to hop selector in time window controls
         self.time_window_controls.hop_selector = self.hop_selector
         
-        # Connect time window controls signals
-        self.time_window_controls.window_changed.connect(self.time_series_graph.set_visible_window)
-        self.time_window_controls.auto_scroll_changed.connect(self.time_series_graph.set_auto_scroll)
-        self.time_window_controls.goto_latest_clicked.connect(self.time_series_graph.goto_latest)
-        self.time_window_controls.final_hop_only_changed.connect(self.time_series_graph.set_final_hop_only_mode)
-        self.time_series_graph.time_range_changed.connect(self.update_time_range_display)
+        # Cache (preset_size, index, tolerance) sorted by size for matching zoom levels to presets
+        self._preset_windows = sorted(
+            (preset_size, i, preset_size * 0.1)  # Within 10% of a preset
+            for i, preset_size in enumerate(self.time_window_controls.get_preset_windows())
+        )
+        self._preset_sizes_sorted = [preset_size for preset_size, _, _ in self._preset_windows]
+        self._last_window_size = None
         
-        # Connect hop selector signals
-        self.hop_selector.hop_visibility_changed.connect(self.time_series_graph.toggle_hop_visibility)
-        self.hop_selector.all_hops_visibility_changed.connect(self.time_series_graph.toggle_all_hops_visibility)
+        # Connect hop selector signals (graph connections are made in _ensure_graphs)
         self.hop_selector.highlight_hop_changed.connect(self.highlight_hop)
         
-        # Connect time series graph hover signal to tooltip update
-        self.time_series_graph.hover_data_changed.connect(self.update_tooltip)
-        
-        # Connect timeseries graph signals to update hop selector UI
-        self.time_series_graph.hop_visibility_updated.connect(self.sync_hop_selector_with_graph)
-        
         # Add bottom widget to content splitter
         content_splitter.addWidget(bottom_widget)
         
@@ -164,40 +194,124 @@ class MainWindow(QMainWindow):
         # Connect hop data grid row selection to highlight function
         self.hop_data_grid.row_selected.connect(self.highlight_hop)
         
+        # Record user-facing setting changes; they are written out on close
+        self.control_panel.interval_changed.connect(self._on_interval_setting_changed)
+        self.control_panel.target_changed.connect(self._on_target_setting_changed)
+        self.time_window_controls.window_changed.connect(self._on_window_setting_changed)
+        self.time_window_controls.auto_scroll_changed.connect(self._on_auto_scroll_setting_changed)
+        
+    def _ensure_graphs(self):
+        """Build the latency and time series graphs the first time they are needed"""
+        if self.latency_bar_graph is None:
+            self.latency_bar_graph = LatencyBarGraph()
+            self._hop_splitter.replaceWidget(self._hop_splitter.indexOf(self._bar_graph_placeholder), self.latency_bar_graph)
+            self._bar_graph_placeholder.deleteLater()
+            self._bar_graph_placeholder = None
+            
+        if self.time_series_graph is None:
+            self.time_series_graph = TimeSeriesGraph()
+            self._ts_splitter.replaceWidget(self._ts_splitter.indexOf(self._time_series_placeholder), self.time_series_graph)
+            self._time_series_placeholder.deleteLater()
+            self._time_series_placeholder = None
+            
+            # Connect time window controls signals
+            self.time_window_controls.window_changed.connect(self.time_series_graph.set_visible_window)
+            self.time_window_controls.auto_scroll_changed.connect(self.time_series_graph.set_auto_scroll)
+            self.time_window_controls.goto_latest_clicked.connect(self.time_series_graph.goto_latest)
+            self.time_window_controls.final_hop_only_changed.connect(self.time_series_graph.set_final_hop_only_mode)
+            self.time_series_graph.time_range_changed.connect(self.update_time_range_display)
+            
+            # Connect hop selector signals
+            self.hop_selector.hop_visibility_changed.connect(self.time_series_graph.toggle_hop_visibility)
+            self.hop_selector.all_hops_visibility_changed.connect(self.time_series_graph.toggle_all_hops_visibility)
+            
+            # Connect time series graph hover signal to tooltip update
+            self.time_series_graph.hover_data_changed.connect(self.update_tooltip)
+            
+            # Connect timeseries graph signals to update hop selector UI
+            self.time_series_graph.hop_visibility_updated.connect(self.sync_hop_selector_with_graph)
+            
+            # Bring the new graph in line with the current control state
+            self.time_series_graph.set_visible_window(self.time_window_controls.get_current_window())
+            self.time_series_graph.set_auto_scroll(self.time_window_controls.auto_scroll_check.isChecked())
+            self.time_series_graph.set_final_hop_only_mode(self.time_window_controls.get_final_hop_only())
+        
     def set_update_interval(self, interval_ms):
         """Set the update interval for network monitoring"""
-        self.update_timer.setInterval(interval_ms)
+        self.update_interval = interval_ms
         self.network_monitor.set_interval(interval_ms // 1000)  # Convert to seconds
         
     def start_monitoring(self):
         """Start or resume network monitoring"""
-        if not self.update_timer.isActive():
+        if not self.monitoring_active:
             target = self.control_panel.get_current_target()
             if target:
+                self._ensure_graphs()
                 self.network_monitor.set_target(target)
                 self.network_monitor.start()
-                self.update_timer.start()
+                self.monitoring_active = True
+                self._last_snapshot = None
                 self.control_panel.set_monitoring_active(True)
     
     def pause_monitoring(self):
         """Pause network monitoring"""
-        if self.update_timer.isActive():
-            self.update_timer.stop()
+        if self.monitoring_active:
+            self.monitoring_active = False
             self.network_monitor.pause()
+            self.paint_timer.stop()
+            self._pending_snapshot = None
             self.control_panel.set_monitoring_active(False)
     
     def set_target(self, target):
         """Set a new target for monitoring"""
         self.network_monitor.set_target(target)
         
-    def update_data(self):
-        """Update UI with latest monitoring data"""
-        data = self.network_monitor.get_current_data()
-        if data:
-            self.hop_data_grid.update_data(data)
-            self.latency_bar_graph.update_data(data)
-            self.time_series_graph.add_data_point(data)
-            self.hop_selector.update_hops(data)
+    def queue_snapshot(self, snapshot):
+        """Buffer a snapshot from the monitor until the next paint tick"""
+        # Drop snapshots that were already queued when monitoring was paused
+        if not self.monitoring_active:
+            return
+        
+        # Only the latest snapshot is kept; intermediate ones are skipped
+        self._pending_snapshot = snapshot
+        if not self.paint_timer.isActive():
+            self.paint_timer.start()
+    
+    def flush_pending_snapshot(self):
+        """Push the buffered snapshot, if any, to the widgets"""
+        snapshot = self._pending_snapshot
+        self._pending_snapshot = None
+        if snapshot is not None and self.monitoring_active:
+            self.update_data(snapshot)
+    
+    def update_data(self, snapshot):
+        """Update UI with the latest monitoring snapshot"""
+        if snapshot is None or not snapshot.hops or self.time_series_graph is None:
+            return
+            
+        last = self._last_snapshot
+        if last is not None and snapshot.seq == last.seq:
+            # Nothing new since the last update
+            return
+            
+        if last is None or snapshot.array['hop'].tolist() != last.array['hop'].tolist():
+            # The hop list changed: rebuild every widget
+            self.hop_data_grid.update_data(snapshot.hops)
+            self.latency_bar_graph.update_data(snapshot.array)
+            self.hop_selector.update_hops(snapshot.hops)
+        else:
+            # Same hops as before: only push the rows and bars that changed
+            for row, (hop, previous) in enumerate(zip(snapshot.hops, last.hops)):
+                if hop != previous:
+                    self.hop_data_grid.update_hop_row(row, hop)
+            
+            changed = np.flatnonzero(snapshot.array['current'] != last.array['current'])
+            if changed.size:
+                self.latency_bar_graph.update_bars(snapshot.array, changed.tolist())
+        
+        # Plot the round at the time it was measured, not when this paint tick runs
+        self.time_series_graph.add_data_point(snapshot.hops, snapshot.timestamp)
+        self._last_snapshot = snapshot
     
     def save_session(self):
         """Save the current session data"""
@@ -206,63 +320,111 @@ class MainWindow(QMainWindow):
         
     def load_settings(self):
         """Load application settings and last session"""
+        # Read every stored key in one pass; QSettings keeps the store in memory
+        stored_keys = set(self.settings.allKeys())
+        
         # Restore window geometry
-        geometry = self.settings.value("geometry")
-        if geometry:
-            self.restoreGeometry(geometry)
+        if "geometry" in stored_keys:
+            self.restoreGeometry(self.settings.value("geometry"))
             
         # Set default interval
-        default_interval = 2500  # 2.5 seconds in ms
-        interval = self.settings.value("interval", default_interval, type=int)
+        interval = 2500  # 2.5 seconds in ms
+        if "interval" in stored_keys:
+            interval = self.settings.value("interval", interval, type=int)
         self.control_panel.set_interval(interval)
         self.set_update_interval(interval)
         
         # Load time window settings
-        default_window = 60  # Default to 1 minute
-        time_window = self.settings.value("time_window", default_window, type=int)
+        time_window = 60  # Default to 1 minute
+        if "time_window" in stored_keys:
+            time_window = self.settings.value("time_window", time_window, type=int)
         self.time_window_controls.set_window(time_window)
-        self.time_series_graph.set_visible_window(time_window)
         
-        auto_scroll = self.settings.value("auto_scroll", True, type=bool)
+        auto_scroll = True
+        if "auto_scroll" in stored_keys:
+            auto_scroll = self.settings.value("auto_scroll", auto_scroll, type=bool)
         self.time_window_controls.set_auto_scroll(auto_scroll)
-        self.time_series_graph.set_auto_scroll(auto_scroll)
         
         # Load last target
-        last_target = self.settings.value("last_target", "")
+        last_target = self.settings.value("last_target", "") if "last_target" in stored_keys else ""
         if last_target:
             self.control_panel.set_target(last_target)
             
         # Load visible hops settings
         # (Will be implemented when we have them)
             
+    def _mark_setting(self, key, value):
+        """Queue a setting to be written on the next save_settings()"""
+        self._settings_dirty[key] = value
+        
+    def _on_interval_setting_changed(self, interval_ms):
+        self._mark_setting("interval", interval_ms)
+        
+    def _on_target_setting_changed(self, target):
+        self._mark_setting("last_target", target)
+        
+    def _on_window_setting_changed(self, seconds):
+        self._mark_setting("time_window", seconds)
+        
+    def _on_auto_scroll_setting_changed(self, enabled):
+        self._mark_setting("auto_scroll", enabled)
+        
     def save_settings(self):
         """Save application settings"""
-        self.settings.setValue("geometry", self.saveGeometry())
-        self.settings.setValue("interval", self.update_timer.interval())
-        self.settings.setValue("last_target", self.control_panel.get_current_target())
-        self.settings.setValue("time_window", self.time_window_controls.get_current_window())
-        self.settings.setValue("auto_scroll", self.time_window_controls.auto_scroll_check.isChecked())
+        # Everything else is already tracked through signals
+        self._mark_setting("geometry", self.saveGeometry())
         
         # Save visible hops settings
         # (Will be implemented when we have them)
         
+        # Write all pending keys, then flush them to storage in one go
+        for key, value in self._settings_dirty.items():
+            self.settings.setValue(key, value)
+        self._settings_dirty.clear()
+        self.settings.sync()
+        
+    def _disconnect_all(self):
+        """Stop timers and drop connections that could deliver after close"""
+        self.paint_timer.stop()
+        self._tooltip_timer.stop()
+        self._range_debounce.stop()
+        for connection in self._connections:
+            self.disconnect(connection)
+        self._connections.clear()
+        
     def closeEvent(self, event):
         """Handle window close event"""
         self.save_settings()
+        self.pause_monitoring()
+        self._disconnect_all()
         event.accept()
         
     def update_time_range_display(self, x_min, x_max):
         """
         Update UI when the time range changes (due to user interaction)
         
+        Range changes arrive once per mouse event while panning or zooming;
+        only the latest one is applied when the debounce timer fires.
+        
         Args:
             x_min: Minimum X value (start time in seconds)
             x_max: Maximum X value (end time in seconds)
         """
+        self._pending_range = (x_min, x_max)
+        if not self._range_debounce.isActive():
+            self._range_debounce.start()
+            
+    def _apply_range_update(self):
+        """Apply the most recent pending time range to the time window controls"""
+        if self._pending_range is None:
+            return
+        x_min, x_max = self._pending_range
+        self._pending_range = None
+        
         # Update auto-scroll status in the time window controls
         # If the range is showing the latest data, auto-scroll is likely enabled
-        if self.time_series_graph.timestamps:
-            latest_time = max(self.time_series_graph.timestamps)
+        latest_time = self.time_series_graph.get_latest_timestamp()
+        if latest_time is not None:
             if abs(x_max - latest_time) < 5:  # Within 5 seconds of the latest data
                 self.time_window_controls.set_auto_scroll(True)
             else:
@@ -270,12 +432,18 @@ class MainWindow(QMainWindow):
                 
         # Try to match the window size in the dropdown if it's close to a preset value
         window_size = x_max - x_min
-        for i in range(self.time_window_controls.window_selector.count()):
-            preset_size = self.time_window_controls.window_selector.itemData(i)
-            if abs(window_size - preset_size) < preset_size * 0.1:  # Within 10% of a preset
-                self.time_window_controls.window_selector.blockSignals(True)
-                self.time_window_controls.window_selector.setCurrentIndex(i)
-                self.time_window_controls.window_selector.blockSignals(False)
+        if window_size == self._last_window_size:
+            return
+        self._last_window_size = window_size
+        
+        # Only the presets on either side of the window size can be within tolerance
+        idx = bisect_left(self._preset_sizes_sorted, window_size)
+        for preset_size, i, tolerance in self._preset_windows[max(0, idx - 1):idx + 1]:
+            if abs(window_size - preset_size) < tolerance:
+                with QSignalBlocker(self.time_window_controls.window_selector):
+                    self.time_window_controls.window_selector.setCurrentIndex(i)
+                # Signals are blocked above, so record the new window here
+                self._mark_setting("time_window", preset_size)
                 break
                 
     def update_tooltip(self, timestamp, hop_values):
@@ -286,13 +454,27 @@ class MainWindow(QMainWindow):
             hop_values: List of (hop_num, latency) tuples
         """
         if hop_values:
-            # Get mouse position and update tooltip
-            cursor_pos = QCursor.pos()
-            self.time_series_tooltip.update_tooltip(timestamp, hop_values)
-            self.time_series_tooltip.move_to_position(cursor_pos.x(), cursor_pos.y())
+            # Keep only the latest hover sample until the timer fires
+            self._tooltip_pending = (timestamp, hop_values)
+            if not self._tooltip_timer.isActive():
+                self._tooltip_timer.start()
         else:
+            self._tooltip_pending = None
+            self._tooltip_timer.stop()
             self.time_series_tooltip.hide()
             
+    def _apply_tooltip_update(self):
+        """Show the most recent pending hover data in the tooltip"""
+        if self._tooltip_pending is None:
+            return
+        timestamp, hop_values = self._tooltip_pending
+        self._tooltip_pending = None
+        
+        # Get mouse position and update tooltip
+        cursor_pos = QCursor.pos()
+        self.time_series_tooltip.update_tooltip(timestamp, hop_values)
+        self.time_series_tooltip.move_to_position(cursor_pos.x(), cursor_pos.y())
+            
     def highlight_hop(self, hop_num):
         """Highlight a specific hop in the UI
         
@@ -308,13 +490,14 @@ class MainWindow(QMainWindow):
         """Synchronize the hop selector UI with the graph's current visibility state"""
         logger.debug("sync_hop_selector_with_graph called")
         final_hop = self.time_series_graph.get_final_hop()
-        logger.debug(f"Final hop: {final_hop}")
-        logger.debug(f"Graph final_hop_only_mode: {self.time_series_graph.final_hop_only_mode}")
-        logger.debug(f"Graph visible_hops: {self.time_series_graph.visible_hops}")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Final hop: %s", final_hop)
+            logger.debug("Graph final_hop_only_mode: %s", self.time_series_graph.final_hop_only_mode)
+            logger.debug("Graph visible_hops: %s", self.time_series_graph.visible_hops)
         
         # If the graph is in final hop only mode, update the hop selector accordingly
         if self.time_series_graph.final_hop_only_mode:
-            logger.debug(f"Setting hop selector to final hop only mode: {final_hop}")
+            logger.debug("Setting hop selector to final hop only mode: %s", final_hop)
             self.hop_selector.set_final_hop_only_mode(True, final_hop)
             
             # Also ensure the checkbox in time window controls is checked
@@ -329,8 +512,5 @@ class MainWindow(QMainWindow):
             logger.debug("Setting time window controls final hop only checkbox to unchecked")
             self.time_window_controls.set_final_hop_only(False)
             
-            # Update individual hop checkboxes to match graph visibility
-            for hop_num in self.hop_selector.hop_checkboxes:
-                visible = hop_num in self.time_series_graph.visible_hops
-                logger.debug(f"Setting hop {hop_num} visibility to {visible}")
-                self.hop_selector.set_hop_visibility(hop_num, visible)
\ No newline at end of file
+            # Update only the hop checkboxes that differ from the graph visibility
+            self.hop_selector.set_visible_hops(self.time_series_graph.visible_hops)
\ No newline at end of file
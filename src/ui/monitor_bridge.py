@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+Qt signal bridge that delivers network monitor snapshots to the UI thread.
+"""
+
+from PyQt6.QtCore import QObject, pyqtSignal
+
+class MonitorBridge(QObject):
+    """Forwards snapshots published by the monitoring thread as a Qt signal"""
+    
+    # Emitted with a core.network.Snapshot after every monitoring round
+    data_ready = pyqtSignal(object)
+    
+    def __init__(self, network_monitor, parent=None):
+        super().__init__(parent)
+        
+        # The monitor calls this from its worker thread; Qt queues the
+        # emission onto the thread that owns the connected receivers
+        self.network_monitor = network_monitor
+        self.network_monitor.snapshot_callback = self.data_ready.emit
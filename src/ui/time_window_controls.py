@@ -24,6 +24,44 @@ class TimeWindowControls(QWidget):
     goto_latest_clicked = pyqtSignal()  # Emitted when "Latest" button is clicked
     final_hop_only_changed = pyqtSignal(bool)  # Emitted when the final hop only mode is toggled
     
+    # Shared by every instance so the stylesheet string is built once
+    _STYLESHEET = """
+        QWidget {
+            background-color: #2b2b2b;
+            color: #ffffff;
+        }
+        QPushButton {
+            background-color: #3c3f41;
+            border: 1px solid #555555;
+            color: #ffffff;
+            padding: 4px 8px;
+            min-width: 80px;
+        }
+        QPushButton:hover {
+            background-color: #4c4f51;
+        }
+        QPushButton:disabled {
+            background-color: #2b2b2b;
+            color: #777777;
+        }
+        QComboBox {
+            background-color: #3c3f41;
+            border: 1px solid #555555;
+            color: #ffffff;
+            padding: 4px;
+            min-width: 80px;
+        }
+        QLabel {
+            color: #ffffff;
+        }
+        QCheckBox {
+            color: #ffffff;
+        }
+        QFrame[frameShape="5"] { /* VLine */
+            color: #555555;
+        }
+    """
+    
     def __init__(self):
         super().__init__()
         
@@ -97,6 +135,10 @@ class TimeWindowControls(QWidget):
         for label, value in options:
             self.window_selector.addItem(label, value)
         
+        # Keep the preset sizes on the Python side for quick lookups
+        self.preset_windows = [value for _, value in options]
+        self._value_to_index = {value: i for i, (_, value) in enumerate(options)}
+        
         # Set default to 1 minute
         self.window_selector.setCurrentIndex(1)
         
@@ -117,6 +159,10 @@ class TimeWindowControls(QWidget):
         """Handle "Latest" button click"""
         self.goto_latest_clicked.emit()
         
+    def get_preset_windows(self):
+        """Get the preset window sizes in seconds, in dropdown order"""
+        return list(self.preset_windows)
+        
     def get_current_window(self):
         """Get the current time window in seconds"""
         index = self.window_selector.currentIndex()
@@ -126,10 +172,9 @@ class TimeWindowControls(QWidget):
         
     def set_window(self, seconds):
         """Set the time window to the specified value"""
-        for i in range(self.window_selector.count()):
-            if self.window_selector.itemData(i) == seconds:
-                self.window_selector.setCurrentIndex(i)
-                break
+        index = self._value_to_index.get(seconds)
+        if index is not None:
+            self.window_selector.setCurrentIndex(index)
                 
     def set_auto_scroll(self, enabled):
         """Set the auto-scroll checkbox state"""
@@ -161,41 +206,4 @@ class TimeWindowControls(QWidget):
         
     def apply_styles(self):
         """Apply custom styles to the control panel"""
-        self.setStyleSheet(
-            """
-            QWidget {
-                background-color: #2b2b2b;
-                color: #ffffff;
-            }
-            QPushButton {
-                background-color: #3c3f41;
-                border: 1px solid #555555;
-                color: #ffffff;
-                padding: 4px 8px;
-                min-width: 80px;
-            }
-            QPushButton:hover {
-                background-color: #4c4f51;
-            }
-            QPushButton:disabled {
-                background-color: #2b2b2b;
-                color: #777777;
-            }
-            QComboBox {
-                background-color: #3c3f41;
-                border: 1px solid #555555;
-                color: #ffffff;
-                padding: 4px;
-                min-width: 80px;
-            }
-            QLabel {
-                color: #ffffff;
-            }
-            QCheckBox {
-                color: #ffffff;
-            }
-            QFrame[frameShape="5"] { /* VLine */
-                color: #555555;
-            }
-            """
-        )
\ No newline at end of file
+        self.setStyleSheet(self._STYLESHEET)
\ No newline at end of file
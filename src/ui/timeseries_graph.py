@@ -5,17 +5,46 @@
 Time series graph for visualizing latency over time.
 """
 
+import importlib.util
 import logging
+import time
+from bisect import insort
 import pyqtgraph as pg
 import numpy as np
-from collections import deque
-from datetime import datetime
-from PyQt6.QtCore import Qt, QTimer, pyqtSignal
+from PyQt6.QtCore import Qt, QEvent, QTimer, pyqtSignal
 from PyQt6.QtGui import QColor, QPen
+from PyQt6.QtWidgets import QGraphicsItem
+
+from core.ring_buffer import RingBuffer
 
 # Configure logger for this module
 logger = logging.getLogger('endless_ping.timeseries_graph')
 
+# Softer color palette for hops (using more muted/pastel colors)
+HOP_COLORS = [
+    '#d9534f',  # Soft red
+    '#5cb85c',  # Soft green
+    '#5bc0de',  # Soft blue
+    '#f0ad4e',  # Soft amber
+    '#a87dc9',  # Soft purple
+    '#20c997',  # Soft teal
+    '#fd7e14',  # Soft orange
+    '#6c757d',  # Soft gray
+    '#e83e8c',  # Soft pink
+    '#17a2b8',  # Soft cyan
+]
+
+# Error codes accepted by TimeSeriesGraph.add_data_points
+ERROR_NONE = 0
+ERROR_NO_ROUTE = 1
+ERROR_OTHER = 2
+
+# Error code for each error_type reported by the monitor; unknown types map to ERROR_OTHER
+ERROR_CODES = {
+    None: ERROR_NONE,
+    'no_route': ERROR_NO_ROUTE,
+}
+
 class TimeSeriesGraph(pg.PlotWidget):
     """Graph showing latency over time for all hops"""
     
@@ -32,18 +61,27 @@ class TimeSeriesGraph(pg.PlotWidget):
         # Maximum number of points to store (increased for longer time periods)
         self.max_points = 86400  # Store up to 24 hours at 1s intervals
         
-        # Data storage - time and latency values
-        self.timestamps = deque(maxlen=self.max_points)
+        # Data storage - time and latency values, kept in ring buffers that
+        # expose the stored samples as contiguous views for plotting without copying
+        self._timestamps = RingBuffer(self.max_points, np.float64)
+        self._t_min = None  # Oldest stored timestamp
+        self._t_max = None  # Newest stored timestamp
         self.hop_lines = {}  # Dict of {hop_num: plot_data_item}
-        self.hop_data = {}   # Dict of {hop_num: deque of latency values}
-        self.hop_errors = {} # Dict of {hop_num: deque of error_type values}
-        self.error_bands = []  # List of error band items
+        self._hop_num_to_idx = {}  # Dict of {hop_num: row in _y}
+        self._sorted_hops = []  # Hop numbers in ascending order
+        self._y = RingBuffer(self.max_points, np.float32, np.nan, rows=0)  # Latency rows, one per hop
+        self._row_max = np.full(0, np.nan, dtype=np.float32)  # Running max latency of each row in _y
+        self._error_runs = {}  # Dict of {hop_num: list of [start, end] no_route runs, end is None while open}
+        self.error_bands = {}  # Dict of {(hop_num, start_time): error band item}
+        self._band_pool = []  # Hidden error band items kept in the plot for reuse
+        self._band_brush = pg.mkBrush(255, 0, 0, 100)  # Semi-transparent red, shared by all bands
         self.visible_hops = set()  # Set of hop numbers that are currently visible
         
         # Mode settings
         self.final_hop_only_mode = False  # Only show the final hop line
+        self._final_hop = None  # Highest hop number seen so far
         
-        # Reference time (first data point)
+        # Reference time (first data point), in time.monotonic() seconds
         self.reference_time = None
         
         # Time window settings
@@ -56,18 +94,37 @@ class TimeSeriesGraph(pg.PlotWidget):
         # Apply custom styles
         self.apply_styles()
         
-        # Set up auto-refresh timer
+        # One pen per palette color (using thinner line width of 1.5 instead of 2)
+        self._pens = [pg.mkPen(color=color, width=1.5) for color in HOP_COLORS]
+        
+        # Redraw only when something changed since the last refresh
+        self._dirty = False
+        
+        # Set up the refresh timer; it is only started when something changed,
+        # so there are no redraws while the ping source is stalled
+        self.max_redraw_rate = 1.0  # Maximum redraws per second
+        self._last_refresh = 0.0  # time.monotonic() of the last redraw
+        self._watched_window = None  # Top-level window whose minimize/restore is tracked
         self.timer = QTimer()
+        self.timer.setSingleShot(True)
+        self.timer.setTimerType(Qt.TimerType.CoarseTimer)  # Let the OS batch wakeups
         self.timer.timeout.connect(self.refresh_plot)
-        self.timer.start(500)  # Refresh twice per second
         
         # Set up hover line
         self.hover_line = pg.InfiniteLine(angle=90, movable=False, pen=pg.mkPen(color='#888888', width=1, style=Qt.PenStyle.DashLine))
         self.hover_line.setVisible(False)
         self.plotItem.addItem(self.hover_line)
         
+        # Coalesce mouse moves so hover work runs at most ~30 times per second,
+        # and never more often than the screen refreshes
+        self._hover_pending = None
+        self._hover_timer = QTimer(self)
+        self._hover_timer.setSingleShot(True)
+        self._hover_timer.setInterval(33)
+        self._hover_timer.timeout.connect(self._apply_hover)
+        
         # Connect mouse events for hover tooltip
-        self.scene().sigMouseMoved.connect(self.on_mouse_moved)
+        self.scene().sigMouseMoved.connect(self.queue_mouse_moved)
         
     def setup_plot(self):
         """Configure the plot appearance and behavior"""
@@ -86,6 +143,16 @@ class TimeSeriesGraph(pg.PlotWidget):
         self.plotItem.enableAutoRange()
         self.plotItem.setAutoVisible(y=True)
         
+        # Render the viewport through OpenGL when PyOpenGL is available
+        if importlib.util.find_spec("OpenGL") is not None:
+            self.useOpenGL(True)
+        else:
+            logger.debug("PyOpenGL not found. Using the default paint engine.")
+        
+        # Only draw the samples inside the view, reduced to min/max pairs per pixel column
+        self.plotItem.setClipToView(True)
+        self.plotItem.setDownsampling(auto=True, mode='peak')
+        
         # Add a horizontal line at 100ms threshold
         threshold_line = pg.InfiniteLine(pos=100, angle=0, pen=pg.mkPen('r', width=1, style=pg.QtCore.Qt.PenStyle.DotLine))
         self.plotItem.addItem(threshold_line)
@@ -97,6 +164,9 @@ class TimeSeriesGraph(pg.PlotWidget):
         # Connect to legend item clicks to intercept visibility toggles
         # This is a workaround since we can't fully disable the legend clicks in pyqtgraph
         def legend_clicked(ev):
+            # The scene reports clicks anywhere on the plot; only clicks on the legend matter
+            if not self.legend.sceneBoundingRect().contains(ev.scenePos()):
+                return False
             # Prevent default action and force our own visibility management
             logger.debug("Legend item clicked - intercepting and blocking default action")
             ev.ignore()  # Prevent default behavior
@@ -112,11 +182,30 @@ class TimeSeriesGraph(pg.PlotWidget):
         self.plotItem.setXRange(0, self.visible_window)  # Show the initial window
         
         # Connect signals for view changes
-        self.plotItem.sigXRangeChanged.connect(self.on_view_changed)
+        # Range changes arrive many times per pan/zoom gesture; handle at most one per 50 ms
+        self._view_timer = QTimer(self)
+        self._view_timer.setSingleShot(True)
+        self._view_timer.setInterval(50)
+        self._view_timer.timeout.connect(self.on_view_changed)
+        self.plotItem.sigXRangeChanged.connect(self.queue_view_changed)
+        
+    def queue_mouse_moved(self, pos):
+        """Remember the latest mouse position and schedule a hover update"""
+        self._hover_pending = pos
+        if not self._hover_timer.isActive():
+            screen = self.screen()
+            frame_ms = 1000 / screen.refreshRate() if screen and screen.refreshRate() > 0 else 0
+            self._hover_timer.start(max(33, int(frame_ms)))
+            
+    def _apply_hover(self):
+        """Process the most recent pending mouse position"""
+        pos, self._hover_pending = self._hover_pending, None
+        if pos is not None:
+            self.on_mouse_moved(pos)
         
     def on_mouse_moved(self, pos):
         """Handle mouse movement for hover tooltip"""
-        if not self.timestamps or len(self.timestamps) <= 1:
+        if len(self._timestamps) <= 1:
             return
             
         # Get mouse position in plot coordinates
@@ -124,23 +213,25 @@ class TimeSeriesGraph(pg.PlotWidget):
         x = mouse_point.x()
         
         # Check if x is within the data range
-        if min(self.timestamps) <= x <= max(self.timestamps):
+        if self._t_min <= x <= self._t_max:
             # Show the hover line
             self.hover_line.setPos(x)
             self.hover_line.setVisible(True)
             
-            # Find the closest timestamp
-            closest_idx = min(range(len(self.timestamps)), 
-                             key=lambda i: abs(self.timestamps[i] - x))
-            closest_time = self.timestamps[closest_idx]
+            # Find the closest timestamp (timestamps are increasing, so bisect)
+            timestamps = self._ts_view()
+            closest_idx = min(int(np.searchsorted(timestamps, x)), len(timestamps) - 1)
+            if closest_idx > 0 and x - timestamps[closest_idx - 1] < timestamps[closest_idx] - x:
+                closest_idx -= 1
+            closest_time = float(timestamps[closest_idx])
             
             # Collect data for all hops at this time point
+            column = self._y.view()[:, closest_idx]
             hop_values = []
-            for hop_num, latency_data in sorted(self.hop_data.items()):
-                if len(latency_data) > closest_idx:
-                    value = latency_data[closest_idx]
-                    if not np.isnan(value):
-                        hop_values.append((hop_num, value))
+            for hop_num in self._sorted_hops:
+                value = column[self._hop_num_to_idx[hop_num]]
+                if not np.isnan(value):
+                    hop_values.append((hop_num, float(value)))
             
             # Emit signal with hover data
             self.hover_data_changed.emit(closest_time, hop_values)
@@ -149,16 +240,22 @@ class TimeSeriesGraph(pg.PlotWidget):
             self.hover_line.setVisible(False)
             self.hover_data_changed.emit(0, [])
         
+    def queue_view_changed(self):
+        """Schedule handling of a view range change"""
+        if not self._view_timer.isActive():
+            self._view_timer.start()
+            
     def on_view_changed(self):
         """Handle manual view changes by the user"""
         # If the user manually changes the view, we may want to disable auto-scroll
-        if self.timestamps:
+        if len(self._timestamps):
             x_range = self.plotItem.viewRange()[0]
-            x_max = max(self.timestamps)
+            x_max = self._t_max
             
             # Check if the view has significantly moved away from the latest data
-            if x_range[1] < x_max - 5:  # More than 5 seconds behind latest data
+            if x_range[1] < x_max - 5 and self.auto_scroll:  # More than 5 seconds behind latest data
                 self.auto_scroll = False
+                self._redraw_now()  # Lines only held the followed window
             
             # Emit signal with current time range
             self.time_range_changed.emit(x_range[0], x_range[1])
@@ -171,94 +268,231 @@ class TimeSeriesGraph(pg.PlotWidget):
         self.plotItem.getAxis('left').setTextPen('#ffffff')
         self.plotItem.getAxis('bottom').setTextPen('#ffffff')
         
-    def add_data_point(self, hop_data):
+    def add_data_point(self, hop_data, timestamp=None):
         """
         Add a new data point for each hop
         
         Args:
             hop_data: List of dictionaries containing hop information
+            timestamp: time.monotonic() seconds when the data was measured (default: now)
         """
         # Get current timestamp
-        now = datetime.now()
+        now = time.monotonic() if timestamp is None else timestamp  # Immune to wall-clock adjustments
         
         # Initialize reference time if needed
         if self.reference_time is None:
             self.reference_time = now
         
         # Calculate seconds since start
-        seconds = (now - self.reference_time).total_seconds()
-        
-        # Add timestamp
-        self.timestamps.append(seconds)
+        seconds = now - self.reference_time
         
-        # Process each hop
+        latencies = {}
+        errors = {}
         for hop in hop_data:
             hop_num = hop['hop']
-            latency = hop['current']
-            error_type = hop.get('error_type')
             
-            # Initialize data storage for this hop if needed
-            if hop_num not in self.hop_data:
-                self.hop_data[hop_num] = deque(maxlen=self.max_points)
-                self.hop_errors[hop_num] = deque(maxlen=self.max_points)
-                
-                # Fill with NaN for previous timestamps
-                for _ in range(len(self.timestamps) - 1):
-                    self.hop_data[hop_num].append(float('nan'))
-                    self.hop_errors[hop_num].append(None)
+            # Latency value (or NaN for timeouts)
+            latencies[hop_num] = hop['current'] if hop['current'] > 0 else np.nan
             
-            # Add latency value (or NaN for timeouts)
-            if latency > 0:
-                self.hop_data[hop_num].append(latency)
+            # Error type
+            errors[hop_num] = ERROR_CODES.get(hop.get('error_type'), ERROR_OTHER)
+        
+        self.add_data_points([seconds], latencies, errors)
+    
+    def add_data_points(self, timestamps, latencies, errors=None):
+        """
+        Add a chunk of samples in one vectorized write
+        
+        Args:
+            timestamps: Sequence of sample times in seconds since the reference time
+            latencies: Dict of {hop_num: latency value or sequence aligned with timestamps};
+                NaN marks a timeout
+            errors: Optional dict of {hop_num: error code or sequence aligned with timestamps}
+        """
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        n = len(timestamps)
+        if not n:
+            return
+        
+        # Only the newest max_points samples can be kept
+        keep = slice(max(0, n - self.max_points), n)
+        errors = errors or {}
+        
+        written = keep.stop - keep.start
+        
+        # Initialize data storage for any new hops
+        for hop_num in latencies:
+            if hop_num not in self._hop_num_to_idx:
+                self._add_hop_row(hop_num)
+        
+        # Assemble the chunk for all rows; hops missing from it get a gap
+        # (overwriting any values from the previous lap)
+        rows = self._y.rows
+        y_chunk = np.full((rows, written), np.nan, dtype=np.float32)
+        for hop_num, values in latencies.items():
+            y_chunk[self._hop_num_to_idx[hop_num]] = np.broadcast_to(values, (n,))[keep]
+        
+        # Max of the samples the ring drops to make room for this chunk
+        evicted = len(self._y) + written - self.max_points
+        if evicted > 0:
+            dropped_max = np.fmax.reduce(self._y.view()[:, :evicted], axis=1)
+        
+        self._timestamps.append_chunk(timestamps[keep])
+        self._y.append_chunk(y_chunk)
+        
+        # Update the running max; rescan only rows whose max may have been dropped
+        if evicted > 0:
+            stale = dropped_max >= self._row_max
+        self._row_max = np.fmax(self._row_max, np.fmax.reduce(y_chunk, axis=1))
+        if evicted > 0 and stale.any():
+            self._row_max[stale] = np.fmax.reduce(self._y.view()[stale], axis=1)
+        
+        self._t_max = float(timestamps[-1])
+        self._t_min = float(self._timestamps.first())
+        self._update_error_runs(timestamps[keep], errors, keep, n)
+        self._mark_dirty()
+    
+    def _update_error_runs(self, timestamps, errors, keep, n):
+        """
+        Extend, open and close the no_route runs of every hop for a new chunk
+        
+        Args:
+            timestamps: Timestamps of the stored chunk samples
+            errors: Dict of {hop_num: error code or sequence} for the whole chunk
+            keep: Slice of the chunk that was stored
+            n: Number of samples in the whole chunk
+        """
+        for hop_num in self._hop_num_to_idx:
+            runs = self._error_runs.setdefault(hop_num, [])
+            is_open = bool(runs) and runs[-1][1] is None
+            
+            # Hops missing from the chunk have no errors in it
+            if hop_num in errors:
+                mask = np.broadcast_to(errors[hop_num], (n,))[keep] == ERROR_NO_ROUTE
+            elif not is_open:
+                continue
             else:
-                self.hop_data[hop_num].append(float('nan'))
+                mask = np.zeros(len(timestamps), dtype=bool)
             
-            # Add error type
-            self.hop_errors[hop_num].append(error_type)
-        
-        # Ensure all hops have the same number of data points
-        for hop_num in self.hop_data:
-            if len(self.hop_data[hop_num]) < len(self.timestamps):
-                # Add NaN for missing data points
-                while len(self.hop_data[hop_num]) < len(self.timestamps):
-                    self.hop_data[hop_num].appendleft(float('nan'))
-                    self.hop_errors[hop_num].appendleft(None)
+            # Rising edges open a run at that sample, falling edges close it
+            edges = np.diff(np.concatenate(([is_open], mask)).view(np.int8))
+            for i in np.flatnonzero(edges):
+                if edges[i] > 0:
+                    runs.append([float(timestamps[i]), None])
+                else:
+                    runs[-1][1] = float(timestamps[i])
+            
+            # Drop runs that ended before the oldest stored sample
+            while runs and runs[0][1] is not None and runs[0][1] <= self._t_min:
+                runs.pop(0)
+    
+    def _add_hop_row(self, hop_num):
+        """
+        Assign a row in the latency and error arrays to a newly seen hop
+        
+        Args:
+            hop_num: The hop number to add
+        """
+        if self._final_hop is None or hop_num > self._final_hop:
+            self._final_hop = hop_num
+        
+        row = len(self._hop_num_to_idx)
+        if row == self._y.rows:
+            # Grow by doubling; unwritten slots are NaN, so no backfill is needed
+            self._y.grow_rows(max(8, 2 * row))
+            self._row_max = np.concatenate(
+                (self._row_max, np.full(self._y.rows - row, np.nan, dtype=np.float32)))
+        
+        self._hop_num_to_idx[hop_num] = row
+        insort(self._sorted_hops, hop_num)
+    
+    def _ts_view(self):
+        """Return the stored timestamps, oldest first, as a zero-copy view"""
+        return self._timestamps.view()
+    
+    def _hop_view(self, hop_num):
+        """Return the stored latencies for a hop, aligned with _ts_view(), as a zero-copy view"""
+        return self._y.view()[self._hop_num_to_idx[hop_num]]
+    
+    def get_latest_timestamp(self):
+        """Return the most recent timestamp in seconds, or None if there is no data"""
+        return self._t_max
+    
+    def set_max_redraw_rate(self, hz):
+        """
+        Set the maximum number of plot redraws per second
+        
+        Args:
+            hz: Redraw rate in Hz
+        """
+        self.max_redraw_rate = hz
+    
+    def _mark_dirty(self):
+        """Flag the plot for redrawing and schedule the next refresh"""
+        self._dirty = True
+        if self.timer.isActive():
+            return
+        
+        # Batch bursts within ~16 ms, and keep redraws at most max_redraw_rate per second
+        elapsed_ms = (time.monotonic() - self._last_refresh) * 1000
+        self.timer.start(max(16, int(1000 / self.max_redraw_rate - elapsed_ms)))
+    
+    def showEvent(self, event):
+        """Draw the changes that arrived while the graph was hidden"""
+        super().showEvent(event)
+        
+        # Restoring a minimized window does not send show events to its children,
+        # so watch the window's state changes instead
+        window = self.window()
+        if window is not self and window is not self._watched_window:
+            if self._watched_window is not None:
+                self._watched_window.removeEventFilter(self)
+            window.installEventFilter(self)
+            self._watched_window = window
+        
+        if self._dirty:
+            self._mark_dirty()
+    
+    def eventFilter(self, obj, event):
+        """Draw the changes that arrived while the window was minimized once it is restored"""
+        if (obj is self._watched_window and event.type() == QEvent.Type.WindowStateChange
+                and self._dirty and not obj.isMinimized()):
+            self._mark_dirty()
+        return super().eventFilter(obj, event)
     
     def refresh_plot(self):
         """Refresh the plot with current data"""
-        if not self.timestamps:
+        if not self._dirty or not len(self._timestamps):
+            return
+        # Nothing to show while hidden or minimized; the pending changes are
+        # drawn once the graph can be seen again
+        if not self.isVisible() or self.window().isMinimized():
             return
+        self._dirty = False
+        self._last_refresh = time.monotonic()
             
-        # Create softer color palette for hops (using more muted/pastel colors)
-        colors = [
-            '#d9534f',  # Soft red
-            '#5cb85c',  # Soft green
-            '#5bc0de',  # Soft blue
-            '#f0ad4e',  # Soft amber
-            '#a87dc9',  # Soft purple
-            '#20c997',  # Soft teal
-            '#fd7e14',  # Soft orange
-            '#6c757d',  # Soft gray
-            '#e83e8c',  # Soft pink
-            '#17a2b8',  # Soft cyan
-        ]
-        
-        # Clean up old error bands (remove all existing bands)
-        for band in self.error_bands:
-            self.plotItem.removeItem(band)
-        self.error_bands = []
+        # Keys of the error bands that are still present after this refresh
+        active_bands = set()
         
         # Initialize visible_hops set if it's empty AND user hasn't explicitly cleared it
         # Only initialize with all hops if there are no existing or previous visibility settings
-        if not self.visible_hops and self.hop_data and not hasattr(self, '_visibility_initialized'):
-            self.visible_hops = set(self.hop_data.keys())
+        if not self.visible_hops and self._hop_num_to_idx and not hasattr(self, '_visibility_initialized'):
+            self.visible_hops = set(self._hop_num_to_idx)
             self._visibility_initialized = True
         
         # Get the final hop if in final hop only mode
         final_hop = self.get_final_hop() if self.final_hop_only_mode else None
         
+        # Timestamps shared by every hop line; while following the latest data only
+        # the visible window (plus one sample to the left) is handed to the lines
+        x = self._ts_view()
+        start = 0
+        if self.auto_scroll:
+            start = max(0, int(np.searchsorted(x, self._t_max - self.visible_window)) - 1)
+            x = x[start:]
+        
         # Update each hop line
-        for i, (hop_num, latency_data) in enumerate(sorted(self.hop_data.items())):
+        for hop_num in self._sorted_hops:
             # Skip if this hop is hidden or if in final hop only mode and not the final hop
             if hop_num not in self.visible_hops or (self.final_hop_only_mode and hop_num != final_hop):
                 if hop_num in self.hop_lines:
@@ -267,23 +501,23 @@ class TimeSeriesGraph(pg.PlotWidget):
                 # Even if the hop line is hidden, we still need to process error bands
                 # If in final hop only mode, we still show all error bands
                 if self.final_hop_only_mode:
-                    self.process_error_bands(hop_num)
+                    self.process_error_bands(hop_num, active_bands)
                     
                 continue
                 
-            # Convert data to numpy arrays
-            x = np.array(self.timestamps)
-            y = np.array(latency_data)
-            
-            # Get color for this hop
-            color_index = (hop_num - 1) % len(colors)
-            color = colors[color_index]
+            # Zero-copy view of this hop's latencies
+            y = self._hop_view(hop_num)[start:]
             
             # Create or update line
             if hop_num not in self.hop_lines:
-                # Create new line (using thinner line width of 1.5 instead of 2)
-                pen = pg.mkPen(color=color, width=1.5)
-                line = self.plotItem.plot(x, y, pen=pen, name=f"Hop {hop_num}")
+                # Create new line with this hop's prebuilt pen
+                pen = self._pens[(hop_num - 1) % len(self._pens)]
+                # NaN gaps are split by connect='finite'; the plot item applies its
+                # downsampling and clip-to-view settings to every line it creates
+                line = self.plotItem.plot(x, y, pen=pen, name=f"Hop {hop_num}", connect='finite')
+                # Cache the rendered curve so hover/overlay repaints just blit it;
+                # the PlotDataItem is only a container, its curve child paints
+                line.curve.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
                 self.hop_lines[hop_num] = line
             else:
                 # Update existing line and ensure it's visible
@@ -291,18 +525,27 @@ class TimeSeriesGraph(pg.PlotWidget):
                 self.hop_lines[hop_num].setData(x, y)
             
             # Process error bands for this hop    
-            self.process_error_bands(hop_num)
+            self.process_error_bands(hop_num, active_bands)
+        
+        # Hide error bands whose runs have scrolled out or are no longer drawn,
+        # keeping them for the next run that needs a band
+        for key in list(self.error_bands):
+            if key not in active_bands:
+                band = self.error_bands.pop(key)
+                band.setVisible(False)
+                self._band_pool.append(band)
         
         # Auto-scale Y axis if needed
         max_latency = 150  # Default
-        for hop_num, latency_data in self.hop_data.items():
-            # Only consider visible hops for y-axis scaling
-            if hop_num in self.visible_hops and (not self.final_hop_only_mode or hop_num == final_hop):
-                # Filter out NaN values
-                filtered_data = [x for x in latency_data if not np.isnan(x)]
-                if filtered_data:
-                    current_max = max(filtered_data)
-                    max_latency = max(max_latency, current_max * 1.1)
+        # Only consider visible hops for y-axis scaling
+        visible_rows = [self._hop_num_to_idx[hop_num] for hop_num in self._sorted_hops
+                        if hop_num in self.visible_hops and (not self.final_hop_only_mode or hop_num == final_hop)]
+        if visible_rows:
+            # NaN-ignoring max of the running row maxima (what np.nanmax uses,
+            # minus its warning when every value is NaN)
+            current_max = float(np.fmax.reduce(self._row_max[visible_rows]))
+            if not np.isnan(current_max):
+                max_latency = max(max_latency, current_max * 1.1)
         
         # Adjust Y range if significantly different
         current_y_range = self.plotItem.viewRange()[1]
@@ -310,8 +553,8 @@ class TimeSeriesGraph(pg.PlotWidget):
             self.plotItem.setYRange(0, max_latency)
         
         # Handle X-axis scrolling based on settings
-        if self.auto_scroll and self.timestamps:
-            x_max = max(self.timestamps)
+        if self.auto_scroll and len(self._timestamps):
+            x_max = self.get_latest_timestamp()
             x_min = max(0, x_max - self.visible_window)
             self.plotItem.setXRange(x_min, x_max)
     
@@ -325,10 +568,11 @@ class TimeSeriesGraph(pg.PlotWidget):
         self.visible_window = seconds
         
         # Update the view immediately if auto-scrolling is enabled
-        if self.auto_scroll and self.timestamps:
-            x_max = max(self.timestamps)
+        if self.auto_scroll and len(self._timestamps):
+            x_max = self.get_latest_timestamp()
             x_min = max(0, x_max - self.visible_window)
             self.plotItem.setXRange(x_min, x_max)
+            self._redraw_now()  # The lines hold only the previous window
     
     def set_auto_scroll(self, enabled):
         """
@@ -337,37 +581,62 @@ class TimeSeriesGraph(pg.PlotWidget):
         Args:
             enabled: Boolean to enable/disable auto-scrolling
         """
+        was_enabled = self.auto_scroll
         self.auto_scroll = enabled
         
         # If enabling auto-scroll, immediately scroll to latest data
-        if enabled and self.timestamps:
-            x_max = max(self.timestamps)
+        if enabled and len(self._timestamps):
+            x_max = self.get_latest_timestamp()
             x_min = max(0, x_max - self.visible_window)
             self.plotItem.setXRange(x_min, x_max)
+        elif was_enabled and not enabled:
+            self._redraw_now()  # Lines only held the followed window
     
     def goto_latest(self):
         """Scroll to show the latest data"""
-        if self.timestamps:
-            x_max = max(self.timestamps)
+        if len(self._timestamps):
+            x_max = self.get_latest_timestamp()
             x_min = max(0, x_max - self.visible_window)
             self.plotItem.setXRange(x_min, x_max)
             self.auto_scroll = True
     
     def goto_time_range(self, x_min, x_max):
         """Set the visible time range explicitly"""
+        was_enabled = self.auto_scroll
         self.auto_scroll = False
         self.plotItem.setXRange(x_min, x_max)
+        if was_enabled:
+            self._redraw_now()  # Lines only held the followed window
+    
+    def _redraw_now(self):
+        """Refresh the plot immediately instead of waiting for the next tick"""
+        self._dirty = True
+        self.refresh_plot()
             
     def clear_data(self):
         """Clear all data and reset the plot"""
-        self.timestamps.clear()
-        self.hop_data.clear()
+        self._timestamps.clear()
+        self._t_min = None
+        self._t_max = None
+        self._hop_num_to_idx.clear()
+        self._sorted_hops.clear()
+        self._y.clear(rows=0)
+        self._row_max = np.full(0, np.nan, dtype=np.float32)
+        self._error_runs.clear()
+        self._final_hop = None
         
         # Remove all lines
         for line in self.hop_lines.values():
             self.plotItem.removeItem(line)
         
         self.hop_lines.clear()
+        
+        # Hide all error bands and keep them for reuse
+        for band in self.error_bands.values():
+            band.setVisible(False)
+            self._band_pool.append(band)
+        self.error_bands.clear()
+        
         self.reference_time = None
         
     def toggle_hop_visibility(self, hop_num, visible):
@@ -394,6 +663,9 @@ class TimeSeriesGraph(pg.PlotWidget):
         if hop_num in self.hop_lines:
             logger.debug(f"Setting hop_line {hop_num} visible: {visible}")
             self.hop_lines[hop_num].setVisible(visible)
+        
+        # Newly shown lines and the Y range are brought up to date on the next tick
+        self._mark_dirty()
             
         # No need to emit signal since this is a response to UI interaction
     
@@ -434,12 +706,16 @@ class TimeSeriesGraph(pg.PlotWidget):
                     logger.debug(f"Restored previous visible hops: {self.visible_hops}")
                 else:
                     # Default to all hops visible if no previous state
-                    self.visible_hops = set(self.hop_data.keys())
+                    self.visible_hops = set(self._hop_num_to_idx)
                     logger.debug(f"No previous state found, showing all hops: {self.visible_hops}")
             
-            # Refresh the plot with new visibility settings
-            logger.debug("Refreshing plot with updated visibility settings")
-            self.refresh_plot()
+            # Flip the existing lines; a hidden line is never redrawn, so no refresh is needed here
+            final_hop = self.get_final_hop()
+            for hop_num, line in self.hop_lines.items():
+                line.setVisible(hop_num in self.visible_hops and (not enabled or hop_num == final_hop))
+            
+            # Newly shown lines, error bands and the Y range are brought up to date on the next tick
+            self._mark_dirty()
             
             # Emit signal so other components can update
             logger.debug("Emitting hop_visibility_updated signal")
@@ -453,66 +729,53 @@ class TimeSeriesGraph(pg.PlotWidget):
         Returns:
             The highest hop number or None if no hops
         """
-        if not self.hop_data:
-            return None
-        return max(self.hop_data.keys())
+        return self._final_hop
     
-    def process_error_bands(self, hop_num):
+    def process_error_bands(self, hop_num, active_bands):
         """Process and draw error bands for a specific hop
         
+        The contiguous 'no_route' runs are tracked as samples arrive, so no
+        stored data is scanned here. Existing bands are reused: a band is keyed
+        by its hop and run start, and only moved while its run changes.
+        
         Args:
             hop_num: The hop number to process
+            active_bands: Set collecting the keys of all bands drawn in this refresh
         """
-        error_data = list(self.hop_errors[hop_num])
+        runs = self._error_runs.get(hop_num)
+        if not runs:
+            return
         
-        # Find contiguous regions with 'no_route' errors
-        if 'no_route' in error_data:
-            # Get timestamps for reference
-            x = np.array(self.timestamps)
+        for start, end in runs:
+            # Runs that began before the oldest stored sample are clipped to it
+            x_start = max(start, self._t_min)
+            # A run that reaches the latest sample extends to the current time
+            x_end = end if end is not None else self._t_max + 1.0
             
-            # Find blocks of consecutive no_route errors
-            in_error_block = False
-            start_idx = None
+            key = (hop_num, start)
+            active_bands.add(key)
             
-            for i, error in enumerate(error_data):
-                if error == 'no_route' and not in_error_block:
-                    # Start of error block
-                    start_idx = i
-                    in_error_block = True
-                elif error != 'no_route' and in_error_block:
-                    # End of error block
-                    end_idx = i
-                    
-                    # Create band for this block
-                    if start_idx < len(x) and start_idx >= 0:
-                        x_start = x[start_idx]
-                        x_end = x[end_idx] if end_idx < len(x) else x[-1] + 1.0
-                        
-                        # Create a very visible band
-                        band = pg.LinearRegionItem(
-                            [x_start, x_end],
-                            movable=False,
-                            brush=pg.mkBrush(255, 0, 0, 100)  # Semi-transparent red
-                        )
-                        band.setZValue(-1)  # Behind data lines but above background
-                        self.plotItem.addItem(band)
-                        self.error_bands.append(band)
-                    
-                    in_error_block = False
+            band = self.error_bands.get(key)
+            if band is not None:
+                if tuple(band.getRegion()) != (x_start, x_end):
+                    band.setRegion((x_start, x_end))
+                continue
             
-            # Check if we ended in an error state
-            if in_error_block and start_idx is not None and start_idx < len(x):
-                x_start = x[start_idx]
-                x_end = x[-1] + 1.0  # Extend to current time
-                
+            if self._band_pool:
+                # Reuse a hidden band that is already in the plot
+                band = self._band_pool.pop()
+                band.setRegion((x_start, x_end))
+                band.setVisible(True)
+            else:
+                # Create a very visible band
                 band = pg.LinearRegionItem(
                     [x_start, x_end],
                     movable=False,
-                    brush=pg.mkBrush(255, 0, 0, 100)  # Semi-transparent red
+                    brush=self._band_brush
                 )
-                band.setZValue(-1)
+                band.setZValue(-1)  # Behind data lines but above background
                 self.plotItem.addItem(band)
-                self.error_bands.append(band)
+            self.error_bands[key] = band
     
     def toggle_all_hops_visibility(self, visible):
         """Toggle visibility for all hops
@@ -526,12 +789,15 @@ class TimeSeriesGraph(pg.PlotWidget):
         
         # Update the visibility set
         if visible:
-            self.visible_hops = set(self.hop_data.keys())
+            self.visible_hops = set(self._hop_num_to_idx)
         else:
             self.visible_hops.clear()
         
         # Update all plot lines
         for hop_num, line in self.hop_lines.items():
             line.setVisible(visible and hop_num in self.visible_hops)
+        
+        # Newly shown lines and the Y range are brought up to date on the next tick
+        self._mark_dirty()
             
         # No need to emit signal since this is a response to UI interaction
\ No newline at end of file
@@ -11,6 +11,11 @@ from PyQt6.QtWidgets import (
 from PyQt6.QtCore import Qt, pyqtSlot
 from PyQt6.QtGui import QColor
 
+from ui.timeseries_graph import HOP_COLORS
+
+# Hop label style for each palette color, matching the lines in the main graph
+_HOP_LABEL_STYLES = [f"color: {color}; font-weight: bold;" for color in HOP_COLORS]
+
 class TimeSeriesToolTip(QFrame):
     """Tooltip that displays data for all hops at a specific time point"""
     
@@ -41,8 +46,8 @@ class TimeSeriesToolTip(QFrame):
         self.grid_layout.setColumnStretch(2, 1)
         self.layout.addLayout(self.grid_layout)
         
-        # Stores colors by hop for consistent appearance
-        self.colors = {}
+        # Reusable label pairs, one per grid row: [hop_label, latency_label, hop_num, highlighted]
+        self._rows = []
         
         # Column headers
         self.grid_layout.addWidget(QLabel("Hop"), 0, 0)
@@ -69,53 +74,41 @@ class TimeSeriesToolTip(QFrame):
         secs = int(timestamp % 60)
         self.time_label.setText(f"Time: {mins:02d}:{secs:02d}")
         
-        # Clear existing hop data rows - need to keep headers
-        for i in reversed(range(self.grid_layout.rowCount())):
-            if i > 0:  # Skip header row
-                for j in range(self.grid_layout.columnCount()):
-                    item = self.grid_layout.itemAtPosition(i, j)
-                    if item is not None:
-                        widget = item.widget()
-                        if widget is not None:
-                            self.grid_layout.removeWidget(widget)
-                            widget.deleteLater()
-                            
-        # Make a more muted color palette matching the main graph
-        colors = [
-            '#d9534f',  # Soft red
-            '#5cb85c',  # Soft green
-            '#5bc0de',  # Soft blue
-            '#f0ad4e',  # Soft amber
-            '#a87dc9',  # Soft purple
-            '#20c997',  # Soft teal
-            '#fd7e14',  # Soft orange
-            '#6c757d',  # Soft gray
-            '#e83e8c',  # Soft pink
-            '#17a2b8',  # Soft cyan
-        ]
-        
-        # Add new hop data rows
+        # Fill the hop data rows, reusing the labels from earlier updates
         for i, (hop_num, latency) in enumerate(sorted(hop_values)):
-            # Row index (after header)
-            row = i + 1
+            if i == len(self._rows):
+                # Row index (after header)
+                row = i + 1
+                hop_label = QLabel()
+                latency_label = QLabel()
+                self.grid_layout.addWidget(hop_label, row, 0)
+                self.grid_layout.addWidget(latency_label, row, 1)
+                self._rows.append([hop_label, latency_label, None, False])
             
-            # Get color for this hop
-            if hop_num not in self.colors:
-                color_index = (hop_num - 1) % len(colors)
-                self.colors[hop_num] = colors[color_index]
-                
-            color = self.colors[hop_num]
+            entry = self._rows[i]
+            hop_label, latency_label = entry[0], entry[1]
             
-            # Create hop number label with color
-            hop_label = QLabel(f"Hop {hop_num}")
-            hop_label.setStyleSheet(f"color: {color}; font-weight: bold;")
-            self.grid_layout.addWidget(hop_label, row, 0)
+            # Relabel and recolor only when the row shows a different hop
+            if entry[2] != hop_num:
+                hop_label.setText(f"Hop {hop_num}")
+                hop_label.setStyleSheet(_HOP_LABEL_STYLES[(hop_num - 1) % len(_HOP_LABEL_STYLES)])
+                entry[2] = hop_num
             
-            # Create latency label
-            latency_label = QLabel(f"{latency:.1f}")
-            if latency > 100:
-                latency_label.setStyleSheet("color: #d9534f; font-weight: bold;")  # Highlight high latency
-            self.grid_layout.addWidget(latency_label, row, 1)
+            latency_label.setText(f"{latency:.1f}")
+            
+            # Toggle the high latency highlight only when it changes
+            highlighted = latency > 100
+            if entry[3] != highlighted:
+                latency_label.setStyleSheet("color: #d9534f; font-weight: bold;" if highlighted else "")
+                entry[3] = highlighted
+            
+            hop_label.setVisible(True)
+            latency_label.setVisible(True)
+        
+        # Hide the rows not needed for this time point
+        for hop_label, latency_label, _, _ in self._rows[len(hop_values):]:
+            hop_label.setVisible(False)
+            latency_label.setVisible(False)
         
         # Show the tooltip
         self.adjustSize()
@@ -6,10 +6,62 @@ DNS and IP lookup utilities for network monitoring.
 """
 
 import socket
-import ipaddress
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Optional, Tuple, Dict, Any
 import re
 
+# Simple hostname validation pattern, compiled once
+_HOSTNAME_RE = re.compile(
+    r'^([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])(\.([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]{0,61}[a-zA-Z0-9]))*$',
+    re.ASCII
+)
+
+class _TTLCache:
+    """Small dictionary cache whose entries expire after a fixed time."""
+    
+    def __init__(self, ttl: float, negative_ttl: float, maxsize: int = 1024):
+        """
+        Args:
+            ttl: Seconds a successful lookup stays cached
+            negative_ttl: Seconds a failed lookup (empty result) stays cached
+            maxsize: Maximum number of entries; the oldest is dropped when full
+        """
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.maxsize = maxsize
+        self._entries = {}  # Dict of {key: (value, expiry)}
+        # Lookups run on the DNS pool and the monitoring threads at once
+        self._lock = threading.Lock()
+    
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value for key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] < time.monotonic():
+                del self._entries[key]
+                return None
+            return entry[0]
+    
+    def set(self, key: str, value: str) -> None:
+        """Cache value for key."""
+        ttl = self.ttl if value else self.negative_ttl
+        with self._lock:
+            if len(self._entries) >= self.maxsize and key not in self._entries:
+                # Dicts keep insertion order, so the first key is the oldest
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (value, time.monotonic() + ttl)
+
+# Lookups repeat for the same hops on every traceroute pass
+_hostname_cache = _TTLCache(ttl=300, negative_ttl=60)
+_ip_cache = _TTLCache(ttl=300, negative_ttl=60)
+
+# Worker threads for lookups that must not block the caller (a slow resolver can take seconds)
+_DNS_POOL = ThreadPoolExecutor(max_workers=8, thread_name_prefix='dns')
+
 def is_valid_ip(ip: str) -> bool:
     """
     Check if the given string is a valid IP address.
@@ -20,11 +72,14 @@ def is_valid_ip(ip: str) -> bool:
     Returns:
         True if valid IP address, False otherwise
     """
-    try:
-        ipaddress.ip_address(ip)
-        return True
-    except ValueError:
-        return False
+    # inet_pton only fills a 4/16-byte buffer, unlike building an ipaddress object
+    for family in (socket.AF_INET, socket.AF_INET6):
+        try:
+            socket.inet_pton(family, ip)
+            return True
+        except (OSError, ValueError):
+            pass
+    return False
 
 def is_valid_hostname(hostname: str) -> bool:
     """
@@ -36,9 +91,10 @@ def is_valid_hostname(hostname: str) -> bool:
     Returns:
         True if valid hostname, False otherwise
     """
-    # Simple hostname validation pattern
-    pattern = r'^([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]{0,61}[a-zA-Z0-9])(\.([a-zA-Z0-9]|[a-zA-Z0-9][a-zA-Z0-9\-]{0,61}[a-zA-Z0-9]))*$'
-    return bool(re.match(pattern, hostname))
+    # Names longer than 253 characters are never valid
+    if len(hostname) > 253:
+        return False
+    return bool(_HOSTNAME_RE.match(hostname))
 
 def resolve_hostname(hostname: str) -> str:
     """
@@ -50,16 +106,23 @@ def resolve_hostname(hostname: str) -> str:
     Returns:
         IP address as string, or empty string if resolution fails
     """
+    # Check if input is already an IP address
+    if is_valid_ip(hostname):
+        return hostname
+    
+    cached = _hostname_cache.get(hostname)
+    if cached is not None:
+        return cached
+    
     try:
-        # Check if input is already an IP address
-        if is_valid_ip(hostname):
-            return hostname
-            
-        # Try to resolve hostname
-        ip = socket.gethostbyname(hostname)
-        return ip
-    except (socket.gaierror, socket.herror):
-        return ""
+        # Try to resolve hostname; getaddrinfo is thread-safe on every platform, unlike
+        # gethostbyname, and is limited to IPv4 since pings use IPv4 raw sockets
+        ip = socket.getaddrinfo(hostname, None, socket.AF_INET, socket.SOCK_STREAM)[0][4][0]
+    except (socket.gaierror, socket.herror, UnicodeError):
+        ip = ""
+    
+    _hostname_cache.set(hostname, ip)
+    return ip
 
 def resolve_ip(ip: str) -> str:
     """
@@ -71,16 +134,46 @@ def resolve_ip(ip: str) -> str:
     Returns:
         Hostname as string, or empty string if resolution fails
     """
+    # Check if input is already a hostname
+    if not is_valid_ip(ip):
+        return ip
+    
+    cached = _ip_cache.get(ip)
+    if cached is not None:
+        return cached
+    
     try:
-        # Check if input is already a hostname
-        if not is_valid_ip(ip):
-            return ip
-            
         # Try to resolve IP
         hostname, _, _ = socket.gethostbyaddr(ip)
-        return hostname
     except (socket.herror, socket.gaierror):
-        return ""
+        hostname = ""
+    
+    _ip_cache.set(ip, hostname)
+    return hostname
+
+def resolve_hostname_async(hostname: str) -> Future:
+    """
+    Resolve a hostname to an IP address on the DNS worker pool.
+    
+    Args:
+        hostname: Hostname to resolve
+    
+    Returns:
+        Future whose result is the value resolve_hostname() would return
+    """
+    return _DNS_POOL.submit(resolve_hostname, hostname)
+
+def resolve_ip_async(ip: str) -> Future:
+    """
+    Resolve an IP address to a hostname on the DNS worker pool.
+    
+    Args:
+        ip: IP address to resolve
+    
+    Returns:
+        Future whose result is the value resolve_ip() would return
+    """
+    return _DNS_POOL.submit(resolve_ip, ip)
 
 def get_host_info(host: str) -> Dict[str, Any]:
     """
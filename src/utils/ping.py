@@ -5,6 +5,7 @@
 Cross-platform ICMP ping implementation using Python's socket module for network monitoring.
 """
 
+import errno
 import socket
 import struct
 import select
@@ -12,17 +13,68 @@ import time
 import random
 import os
 import platform
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional, Tuple, List
 
+from utils.ip_lookup import resolve_hostname
+
+# Sequence numbers for echo requests; unique per ping_host call so concurrent
+# pings (which all see every ICMP packet on their raw sockets) can tell their replies apart
+_sequence_numbers = itertools.count(1)
+
+# Platform facts checked on every ping, looked up once
+_IS_WINDOWS = platform.system().lower() == "windows"
+_HAS_RAW_PRIVS = _IS_WINDOWS or (hasattr(os, 'geteuid') and os.geteuid() == 0)
+
+# Socket option for kernel receive timestamps in nanoseconds (also the cmsg type).
+# The socket module does not export it, so this is Linux's SO_TIMESTAMPNS_OLD,
+# whose cmsg is a struct timespec of two native longs. Its value is 35 only on
+# the architectures using the asm-generic numbering; others (e.g. parisc, sparc)
+# number it differently, so kernel timestamps are not used there
+_GENERIC_SOCKOPT_MACHINES = ('x86_64', 'amd64', 'i386', 'i486', 'i586', 'i686',
+                             'aarch64', 'arm', 'riscv', 'ppc', 's390', 'loongarch')
+_SO_TIMESTAMPNS = (35 if platform.system().lower() == "linux"
+                   and platform.machine().lower().startswith(_GENERIC_SOCKOPT_MACHINES) else None)
+_TIMESPEC = struct.Struct('@ll')  # struct timespec (SO_TIMESTAMPNS_OLD): seconds, nanoseconds
+_ANCDATA_SIZE = socket.CMSG_SPACE(_TIMESPEC.size) if hasattr(socket, 'CMSG_SPACE') else 0
+
+# Socket errors that mean the raw socket is not permitted
+_PERMISSION_ERRNOS = (errno.EACCES, errno.EPERM)
+
+# Payload of every echo request, and its contribution to the checksum (computed once;
+# the payload starts on a 16-bit boundary and has an even length)
+_PAYLOAD = b'abcdefghijklmnopqrstuvwxyz'
+_PAYLOAD_SUM = int.from_bytes(_PAYLOAD, 'big') % 0xffff
+
+# Echo request header: type (8), code (8), checksum (16), id (16), sequence (16)
+_ICMP_HEADER = struct.Struct('!BBHHH')
+
+# Identifier and sequence number read as one integer, to match replies to requests
+_ID_SEQ = struct.Struct('!I')
+
+# Raw socket of each pinging thread, kept open between ping_host calls. Each
+# socket is recorded in its thread's registry (a list) so close_pool() can close
+# the sockets of one set of threads; threads without one use _pool_sockets
+_tls = threading.local()
+_pool_lock = threading.Lock()
+_pool_sockets = []
+
+# Worker threads for ping_hosts; they live as long as the process, so their
+# sockets stay open between calls
+_ping_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix='ping')
+
 class ICMPSocket:
     """Helper class for creating and sending ICMP packets."""
     
     ICMP_ECHO_REQUEST = 8  # ICMP type code for echo request
+    ICMP_ECHO_REPLY = 0  # ICMP type code for echo reply
     
     def __init__(self, timeout: int):
         """Initialize ICMP socket."""
         self.timeout = timeout
-        if platform.system().lower() == "windows":
+        if _IS_WINDOWS:
             # On Windows, we need to use ICMP socket
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
         else:
@@ -30,6 +82,19 @@ class ICMPSocket:
             self.socket = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
             
         self.socket.settimeout(timeout)
+        
+        # Receive buffer reused for every incoming packet
+        self._rx = bytearray(1500)
+        
+        # Have the kernel timestamp incoming packets, so the measured round trip
+        # excludes the time until this thread gets to read the reply
+        self._kernel_timestamps = False
+        if _SO_TIMESTAMPNS is not None and _ANCDATA_SIZE:
+            try:
+                self.socket.setsockopt(socket.SOL_SOCKET, _SO_TIMESTAMPNS, 1)
+                self._kernel_timestamps = True
+            except OSError:
+                pass
     
     def __enter__(self):
         """Context manager entry."""
@@ -39,60 +104,139 @@ class ICMPSocket:
         """Context manager exit."""
         self.socket.close()
     
-    def checksum(self, data: bytes) -> int:
-        """Calculate the checksum of a packet."""
-        if len(data) % 2:
-            data += b'\x00'
-        
-        s = sum(struct.unpack('!{}H'.format(len(data) // 2), data))
-        s = (s >> 16) + (s & 0xffff)
-        s += s >> 16
-        return ~s & 0xffff
-    
-    def create_packet(self, id: int = None) -> bytes:
+    def create_packet(self, id: int = None, sequence: int = None) -> bytes:
         """Create an ICMP echo request packet."""
         # If id is not provided, use a random ID
         if id is None:
             id = os.getpid() & 0xFFFF
-            
-        # Header is type (8), code (8), checksum (16), id (16), sequence (16)
-        header = struct.pack('!BBHHH', self.ICMP_ECHO_REQUEST, 0, 0, id, 1)
         
-        # Create some data for the packet
-        data = b'abcdefghijklmnopqrstuvwxyz'
-        
-        # Calculate the checksum on the data and the header
-        checksum = self.checksum(header + data)
+        # If sequence is not provided, take the next one
+        if sequence is None:
+            sequence = next(_sequence_numbers) & 0xFFFF
+            
+        # Only the header words vary between packets, so the one's complement sum is the
+        # payload's precomputed sum plus type/code, id and sequence; 2**16 == 1 (mod 0xffff),
+        # so reducing mod 0xffff folds in the end-around carries
+        s = (_PAYLOAD_SUM + (self.ICMP_ECHO_REQUEST << 8) + id + sequence) % 0xffff
+        checksum = ~(s or 0xffff) & 0xffff  # The type is nonzero, so a zero sum means 0xffff
         
-        # Insert the checksum into the header
-        header = struct.pack('!BBHHH', self.ICMP_ECHO_REQUEST, 0, checksum, id, 1)
+        header = _ICMP_HEADER.pack(self.ICMP_ECHO_REQUEST, 0, checksum, id, sequence)
         
         # Return the complete packet
-        return header + data
+        return header + _PAYLOAD
     
-    def send_packet(self, dest_addr: str, packet: bytes) -> Tuple[float, Optional[bytes]]:
-        """Send an ICMP packet and get a response."""
-        start_time = time.time()
+    def drain(self):
+        """Discard packets queued on the socket since its last use."""
+        # A raw socket receives every ICMP packet for this host, so a reused
+        # socket would otherwise fill its buffer with other pings' replies
+        while select.select([self.socket], [], [], 0)[0]:
+            self.socket.recv_into(self._rx)
+    
+    def send_packets(self, dest_addr: str, packets: List[bytes]) -> List[float]:
+        """Send several ICMP packets back to back and collect the round-trip times (ms) of their replies."""
+        # Send times of each outstanding request, keyed by the identifier and
+        # sequence number its reply echoes back: monotonic integer nanoseconds
+        # (unaffected by clock adjustments), plus the wall clock that kernel
+        # receive timestamps use
+        start_times = {}
+        latencies = []
         
         try:
-            self.socket.sendto(packet, (dest_addr, 1))
+            for packet in packets:
+                start_times[_ID_SEQ.unpack_from(packet, 4)[0]] = (time.perf_counter_ns(), time.time_ns())
+                self.socket.sendto(packet, (dest_addr, 1))
             
-            ready = select.select([self.socket], [], [], self.timeout)
-            if ready[0]:
-                recv_packet, addr = self.socket.recvfrom(1024)
-                return time.time() - start_time, recv_packet
-            else:
-                return time.time() - start_time, None
+            # Drain the replies until all requests are answered or the timeout passes
+            deadline = time.perf_counter_ns() + int(self.timeout * 1e9)
+            while start_times:
+                remaining = deadline - time.perf_counter_ns()
+                if remaining <= 0:
+                    break
+                
+                ready = select.select([self.socket], [], [], remaining / 1e9)
+                if not ready[0]:
+                    break
+                
+                if self._kernel_timestamps:
+                    nbytes, ancdata, _, addr = self.socket.recvmsg_into([self._rx], _ANCDATA_SIZE)
+                else:
+                    nbytes, addr = self.socket.recvfrom_into(self._rx)
+                    ancdata = ()
+                rx = self._rx
+                
+                # The raw socket sees every ICMP packet for this host; skip the
+                # IP header (its length is in the low nibble of the first byte)
+                # and accept only echo replies to our outstanding requests
+                offset = (rx[0] & 0x0F) * 4
+                if nbytes >= offset + 8 and rx[offset] == self.ICMP_ECHO_REPLY:
+                    start_time = start_times.pop(_ID_SEQ.unpack_from(rx, offset + 4)[0], None)
+                    if start_time is not None:
+                        latencies.append(self._round_trip_ms(start_time, ancdata))
+            
+            return latencies
         except socket.gaierror:
             raise socket.gaierror("Name or service not known")
         except socket.error as e:
-            if "No route to host" in str(e):
-                raise socket.error("No route to host")
-            elif "Permission denied" in str(e):
+            # Classify by errno; the messages are locale-dependent
+            if e.errno in _PERMISSION_ERRNOS:
                 raise PermissionError("Root privileges required for raw socket on Unix systems")
-            else:
-                raise e
+            raise
+    
+    def _round_trip_ms(self, start_time: Tuple[int, int], ancdata: list) -> float:
+        """Round-trip time of a reply in ms, from its kernel receive timestamp when there is one."""
+        perf_start, wall_start = start_time
+        for level, kind, data in ancdata:
+            if level == socket.SOL_SOCKET and kind == _SO_TIMESTAMPNS and len(data) >= _TIMESPEC.size:
+                seconds, nanoseconds = _TIMESPEC.unpack_from(data)
+                elapsed = seconds * 1_000_000_000 + nanoseconds - wall_start
+                # A wall clock step between send and receive makes the
+                # difference meaningless; use the monotonic clock then
+                if elapsed >= 0 and elapsed <= self.timeout * 1_000_000_000:
+                    return elapsed / 1e6
+        return (time.perf_counter_ns() - perf_start) / 1e6
+
+
+def _get_icmp_socket(timeout: int) -> ICMPSocket:
+    """Return the calling thread's ICMP socket, creating it on first use."""
+    icmp = getattr(_tls, 'icmp', None)
+    if icmp is None or icmp.socket.fileno() == -1:
+        icmp = ICMPSocket(timeout)
+        _tls.icmp = icmp
+        with _pool_lock:
+            getattr(_tls, 'registry', _pool_sockets).append(icmp)
+    else:
+        if icmp.timeout != timeout:
+            icmp.timeout = timeout
+            icmp.socket.settimeout(timeout)
+        icmp.drain()
+    return icmp
+
+def set_socket_registry(registry: list):
+    """
+    Record the ICMP sockets the calling thread opens in the given registry.
+    
+    Meant as a ThreadPoolExecutor initializer, so the sockets of that pool's
+    threads can be closed with close_pool(registry) without touching others.
+    
+    Args:
+        registry: List that collects the thread's sockets
+    """
+    _tls.registry = registry
 
+def close_pool(registry: Optional[list] = None):
+    """
+    Close the ICMP sockets kept open by ping_host.
+    
+    Args:
+        registry: Registry passed to set_socket_registry() by the threads whose
+            sockets should be closed; defaults to threads without a registry
+    """
+    if registry is None:
+        registry = _pool_sockets
+    with _pool_lock:
+        for icmp in registry:
+            icmp.socket.close()
+        registry.clear()
 
 def ping_host(host: str, timeout: int = 1, count: int = 1) -> Dict[str, Any]:
     """
@@ -119,58 +263,49 @@ def ping_host(host: str, timeout: int = 1, count: int = 1) -> Dict[str, Any]:
     }
     
     try:
-        # Resolve hostname to IP address
-        try:
-            dest_addr = socket.gethostbyname(host)
-        except socket.gaierror:
+        # Resolve hostname to IP address; lookups are cached with a TTL, so the
+        # same host pinged every round does not go to the resolver each time
+        dest_addr = resolve_hostname(host)
+        if not dest_addr:
             result['error'] = "Name or service not known"
             result['error_type'] = "unknown"
             return result
         
         # Make sure we have permissions to create raw sockets
-        if platform.system().lower() != "windows" and os.geteuid() != 0:
+        if not _HAS_RAW_PRIVS:
             result['error'] = "Root privileges required for raw socket on Unix systems"
             result['error_type'] = "permission"
             return result
             
-        # Create socket and ping
+        # Ping on this thread's socket, which stays open for the next call
         try:
-            with ICMPSocket(timeout) as icmp:
-                packet = icmp.create_packet()
-                
-                latencies = []
-                for i in range(count):
-                    elapsed_time, recv_packet = icmp.send_packet(dest_addr, packet)
-                    
-                    if recv_packet:
-                        latencies.append(elapsed_time * 1000)  # Convert to ms
-                    
-                    # If we're sending multiple pings, add a small delay between them
-                    if i < count - 1:
-                        time.sleep(0.1)
-                
-                if latencies:
-                    # Calculate average latency
-                    avg_latency = sum(latencies) / len(latencies)
-                    result['success'] = True
-                    result['latency'] = avg_latency
-                else:
-                    result['error'] = "Request timed out"
-                    result['error_type'] = "timeout"
+            icmp = _get_icmp_socket(timeout)
+            
+            # Send all requests at once, each with its own sequence number,
+            # and wait for their replies together
+            packets = [icmp.create_packet() for _ in range(count)]
+            latencies = icmp.send_packets(dest_addr, packets)
+            
+            if latencies:
+                # Calculate average latency
+                avg_latency = sum(latencies) / len(latencies)
+                result['success'] = True
+                result['latency'] = avg_latency
+            else:
+                result['error'] = "Request timed out"
+                result['error_type'] = "timeout"
         
         except PermissionError as e:
             result['error'] = str(e)
             result['error_type'] = "permission"
         
         except socket.error as e:
-            result['error'] = str(e)
-            
-            if "No route to host" in str(e):
+            if e.errno == errno.EHOSTUNREACH:
+                result['error'] = "No route to host"
                 result['error_type'] = "no_route"
-            elif "Permission denied" in str(e):
-                result['error_type'] = "permission"
             else:
-                result['error_type'] = "unknown"
+                result['error'] = str(e)
+                result['error_type'] = "permission" if e.errno in _PERMISSION_ERRNOS else "unknown"
                 
     except Exception as e:
         result['error'] = str(e)
@@ -185,6 +320,25 @@ def ping_host(host: str, timeout: int = 1, count: int = 1) -> Dict[str, Any]:
     return result
 
 
+def ping_hosts(hosts: List[str], timeout: int = 1, count: int = 1) -> Dict[str, Dict[str, Any]]:
+    """
+    Ping several hosts concurrently.
+    
+    The pings run on a shared pool of worker threads; socket calls release the
+    GIL, so the total time is about that of the slowest host rather than the sum.
+    
+    Args:
+        hosts: The hostnames or IP addresses to ping
+        timeout: Timeout in seconds
+        count: Number of pings to send to each host
+    
+    Returns:
+        Dictionary of {host: ping_host() result}
+    """
+    results = _ping_executor.map(lambda host: ping_host(host, timeout, count), hosts)
+    return dict(zip(hosts, results))
+
+
 # Example usage
 if __name__ == "__main__":
     # Try to ping Google's DNS server
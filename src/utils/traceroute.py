@@ -8,9 +8,34 @@ Cross-platform traceroute implementation for network monitoring.
 import subprocess
 import re
 import platform
+import select
 import socket
+import threading
 import time
-from typing import List, Dict, Any, Optional
+from typing import Callable, Iterator, List, Dict, Any, Optional
+
+from utils.ip_lookup import resolve_hostname
+from utils.ping import ICMPSocket
+
+# Operating system, looked up once
+_OS_NAME = platform.system().lower()
+
+# ICMP types, besides echo reply, that answer a traceroute probe
+ICMP_DEST_UNREACHABLE = 3
+ICMP_TIME_EXCEEDED = 11
+
+# Raw traceroute probes still unanswered after this delay are sent again, up to
+# this many more times, so a single lost packet does not hide a hop
+_PROBE_RETRY_INTERVAL = 0.25  # seconds
+_PROBE_RETRIES = 2
+
+# Patterns used by the output parsers, compiled once
+
+# Windows tracert lines, e.g.
+# "  1     1 ms     1 ms     1 ms  192.168.1.1"
+# "  2    14 ms    14 ms    14 ms  10.0.0.1"
+# "  3     *        *        *     Request timed out."
+_WIN_HOP_RE = re.compile(r'^\s*(\d+)(?:\s+(<?\d+\s*ms|\*)\s+(<?\d+\s*ms|\*)\s+(<?\d+\s*ms|\*))\s+([\d\.]+|[a-zA-Z0-9\.\-]+|\*)')
 
 def perform_traceroute(target: str, max_hops: int = 30, timeout: int = 5) -> List[Dict[str, Any]]:
     """
@@ -28,29 +53,52 @@ def perform_traceroute(target: str, max_hops: int = 30, timeout: int = 5) -> Lis
             - hostname: Hostname of the hop (if resolved)
             - rtt: List of round-trip times (ms)
     """
-    os_name = platform.system().lower()
+    try:
+        return list(iter_traceroute(target, max_hops, timeout))
+    except (subprocess.TimeoutExpired, subprocess.CalledProcessError):
+        return [{'hop': 1, 'ip': '*', 'hostname': '', 'rtt': []}]
+
+def iter_traceroute(target: str, max_hops: int = 30, timeout: int = 5) -> Iterator[Dict[str, Any]]:
+    """
+    Perform a traceroute to the target, yielding each hop as soon as it is known.
+    
+    Where raw sockets are available (Unix with root privileges) the probes are sent
+    directly; otherwise the system traceroute command is run and its output parsed
+    line by line as it arrives.
+    
+    Args:
+        target: The hostname or IP address to trace to
+        max_hops: Maximum number of hops to trace
+        timeout: Timeout in seconds
+    
+    Yields:
+        Dictionaries with the same keys as the perform_traceroute() results
+    
+    Raises:
+        subprocess.TimeoutExpired: If the whole traceroute takes longer than timeout * max_hops
+        subprocess.CalledProcessError: If the traceroute command fails
+    """
+    os_name = _OS_NAME
     
     if os_name == 'windows':
         return _traceroute_windows(target, max_hops, timeout)
     elif os_name in ('darwin', 'linux'):
-        return _traceroute_unix(target, max_hops, timeout, os_name)
+        try:
+            return _traceroute_raw(target, max_hops, timeout)
+        except OSError:
+            # No raw socket access (or the probes could not be sent): use the command
+            return _traceroute_unix(target, max_hops, timeout, os_name)
     else:
         raise OSError(f"Unsupported operating system: {os_name}")
 
-def _traceroute_windows(target: str, max_hops: int, timeout: int) -> List[Dict[str, Any]]:
+def _traceroute_windows(target: str, max_hops: int, timeout: int) -> Iterator[Dict[str, Any]]:
     """Perform traceroute on Windows using 'tracert'"""
     # Build command
     cmd = ['tracert', '-d', '-h', str(max_hops), '-w', str(timeout * 1000), target]
     
-    try:
-        output = subprocess.check_output(cmd, universal_newlines=True, timeout=timeout * max_hops)
-        return _parse_windows_traceroute(output)
-    except subprocess.TimeoutExpired:
-        return [{'hop': 1, 'ip': '*', 'hostname': '', 'rtt': []}]
-    except subprocess.CalledProcessError:
-        return [{'hop': 1, 'ip': '*', 'hostname': '', 'rtt': []}]
+    return _stream_hops(cmd, _parse_windows_line, timeout * max_hops)
 
-def _traceroute_unix(target: str, max_hops: int, timeout: int, os_name: str) -> List[Dict[str, Any]]:
+def _traceroute_unix(target: str, max_hops: int, timeout: int, os_name: str) -> Iterator[Dict[str, Any]]:
     """Perform traceroute on Unix-like systems"""
     # Determine the appropriate command
     if os_name == 'darwin':  # macOS
@@ -58,111 +106,239 @@ def _traceroute_unix(target: str, max_hops: int, timeout: int, os_name: str) ->
     else:  # Linux
         cmd = ['traceroute', '-m', str(max_hops), '-w', str(timeout), '-n', target]
     
+    return _stream_hops(cmd, lambda line: _parse_unix_line(line, os_name), timeout * max_hops)
+
+def _traceroute_raw(target: str, max_hops: int, timeout: int) -> Iterator[Dict[str, Any]]:
+    """Perform traceroute with ICMP echo requests sent directly on a raw socket"""
+    dest_addr = resolve_hostname(target)
+    if not dest_addr:
+        raise OSError(f"Cannot resolve {target}")
+    
+    # Open the socket and send the probes up front, so a missing privilege or
+    # an unreachable network raises here and the caller can fall back
+    icmp = ICMPSocket(timeout)
     try:
-        output = subprocess.check_output(cmd, universal_newlines=True, timeout=timeout * max_hops)
-        return _parse_unix_traceroute(output, os_name)
-    except subprocess.TimeoutExpired:
-        return [{'hop': 1, 'ip': '*', 'hostname': '', 'rtt': []}]
-    except subprocess.CalledProcessError:
-        return [{'hop': 1, 'ip': '*', 'hostname': '', 'rtt': []}]
+        sock = icmp.socket
+        
+        # Send one probe per TTL, all at once; each has its own sequence number,
+        # which the replies quote back
+        probes = {}  # Dict of {id and sequence bytes: (ttl, send time)}
+        for ttl in range(1, max_hops + 1):
+            _send_probe(icmp, dest_addr, ttl, probes)
+    except BaseException:
+        icmp.socket.close()
+        raise
+    
+    return _collect_raw_hops(icmp, dest_addr, probes, max_hops, timeout)
+
+def _send_probe(icmp: ICMPSocket, dest_addr: str, ttl: int, probes: Dict[bytes, Any]):
+    """Send one traceroute probe with the given TTL and record it in probes"""
+    packet = icmp.create_packet()
+    icmp.socket.setsockopt(socket.IPPROTO_IP, socket.IP_TTL, ttl)
+    probes[packet[4:8]] = (ttl, time.perf_counter_ns())
+    icmp.socket.sendto(packet, (dest_addr, 1))
 
-def _parse_windows_traceroute(output: str) -> List[Dict[str, Any]]:
-    """Parse Windows tracert output"""
-    hops = []
-    
-    # Regular expression to match tracert lines
-    # Examples:
-    # "  1     1 ms     1 ms     1 ms  192.168.1.1"
-    # "  2    14 ms    14 ms    14 ms  10.0.0.1"
-    # "  3     *        *        *     Request timed out."
-    hop_pattern = re.compile(r'^\s*(\d+)(?:\s+(<?\d+\s*ms|\*)\s+(<?\d+\s*ms|\*)\s+(<?\d+\s*ms|\*))\s+([\d\.]+|[a-zA-Z0-9\.\-]+|\*)')
-    
-    lines = output.splitlines()
-    for line in lines:
-        match = hop_pattern.match(line)
-        if match:
-            hop_num = int(match.group(1))
+def _collect_raw_hops(icmp: ICMPSocket, dest_addr: str, probes: Dict[bytes, Any], max_hops: int,
+                      timeout: int) -> Iterator[Dict[str, Any]]:
+    """Read the replies to the raw traceroute probes, yielding hops in order as they arrive"""
+    def hop_entry(ttl):
+        ip, rtt = replies.get(ttl, ('*', None))
+        return {
+            'hop': ttl,
+            'ip': ip,
+            'hostname': '',
+            'rtt': [] if rtt is None else [rtt]
+        }
+    
+    sock = icmp.socket
+    replies = {}  # Dict of {ttl: (address, rtt in ms)}
+    next_ttl = 1  # Lowest TTL not yet yielded
+    last_ttl = max_hops + 1  # Lowest TTL that reached the end of the path
+    deadline = time.perf_counter_ns() + int(timeout * 1e9)
+    retry_interval = int(_PROBE_RETRY_INTERVAL * 1e9)
+    retry_at = time.perf_counter_ns() + retry_interval
+    retries = 0
+    try:
+        while next_ttl <= min(last_ttl, max_hops):
+            now = time.perf_counter_ns()
+            if now >= deadline:
+                break
+            
+            if retries < _PROBE_RETRIES and now >= retry_at:
+                # Probe again the hops still missing before the end of the path
+                for ttl in range(next_ttl, min(last_ttl, max_hops + 1)):
+                    if ttl not in replies:
+                        try:
+                            _send_probe(icmp, dest_addr, ttl, probes)
+                        except OSError:
+                            # A failed resend is just another lost probe
+                            pass
+                retries += 1
+                retry_at = now + retry_interval
             
-            # Extract RTTs
-            rtt_values = []
-            for i in range(2, 5):
-                rtt_str = match.group(i).strip()
-                if rtt_str != '*':
-                    try:
-                        # Extract just the number from strings like "14 ms" or "<1 ms"
-                        rtt_value = float(re.search(r'(<?)(\d+)', rtt_str).group(2))
-                        rtt_values.append(rtt_value)
-                    except (AttributeError, ValueError):
-                        pass
+            wake = deadline if retries >= _PROBE_RETRIES else min(deadline, retry_at)
+            if not select.select([sock], [], [], (wake - now) / 1e9)[0]:
+                continue
             
-            # Get IP/hostname
-            ip_or_host = match.group(5)
+            recv_packet, addr = sock.recvfrom(1024)
+            recv_time = time.perf_counter_ns()
             
-            # Check if it's an IP address or hostname
-            is_ip = re.match(r'^[\d\.]+$', ip_or_host) is not None
+            # Skip the IP header (its length is in the low nibble of the first byte)
+            offset = (recv_packet[0] & 0x0F) * 4
+            if len(recv_packet) < offset + 8:
+                continue
+            icmp_type = recv_packet[offset]
+            if icmp_type == ICMPSocket.ICMP_ECHO_REPLY:
+                key = recv_packet[offset + 4:offset + 8]
+            elif icmp_type in (ICMP_TIME_EXCEEDED, ICMP_DEST_UNREACHABLE):
+                # Errors quote the probe's IP header and the start of its ICMP header
+                inner = offset + 8
+                if len(recv_packet) < inner + 1:
+                    continue
+                inner += (recv_packet[inner] & 0x0F) * 4
+                key = recv_packet[inner + 4:inner + 8]
+            else:
+                continue
             
-            hop_entry = {
-                'hop': hop_num,
-                'ip': ip_or_host if is_ip or ip_or_host == '*' else '',
-                'hostname': '' if is_ip or ip_or_host == '*' else ip_or_host,
-                'rtt': rtt_values
-            }
+            probe = probes.get(key)
+            if probe is None or probe[0] in replies:
+                continue
+            ttl, send_time = probe
+            replies[ttl] = (addr[0], (recv_time - send_time) / 1e6)
             
-            hops.append(hop_entry)
+            # Echo replies come from the target; unreachable errors end the path too
+            if icmp_type != ICMP_TIME_EXCEEDED:
+                last_ttl = min(last_ttl, ttl)
+            
+            # Replies arrive out of order; yield only the hops whose
+            # predecessors are all known
+            while next_ttl <= last_ttl and next_ttl in replies:
+                yield hop_entry(next_ttl)
+                next_ttl += 1
+        
+        # Out of time: the hops still missing never answered any of their probes
+        if last_ttl > max_hops:
+            last_ttl = max(replies, default=0)
+        for ttl in range(next_ttl, last_ttl + 1):
+            yield hop_entry(ttl)
+    finally:
+        # Also reached when the consumer stops early
+        sock.close()
+
+def _stream_hops(cmd: List[str], parse_line: Callable[[str], Optional[Dict[str, Any]]],
+                 timeout: int) -> Iterator[Dict[str, Any]]:
+    """Run a traceroute command and yield the hops parsed from its output line by line"""
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, universal_newlines=True, bufsize=1)
+    
+    # Reading the output blocks until the command prints, so enforce the
+    # overall timeout by killing it
+    timed_out = threading.Event()
+    def expire():
+        timed_out.set()
+        process.kill()
+    timer = threading.Timer(timeout, expire)
+    timer.start()
     
-    return hops
+    try:
+        for line in process.stdout:
+            hop_entry = parse_line(line)
+            if hop_entry is not None:
+                yield hop_entry
+        returncode = process.wait()
+    finally:
+        # Also reached when the consumer stops early
+        timer.cancel()
+        if process.poll() is None:
+            process.kill()
+        process.stdout.close()
+        process.wait()
+    
+    if timed_out.is_set():
+        raise subprocess.TimeoutExpired(cmd, timeout)
+    if returncode:
+        raise subprocess.CalledProcessError(returncode, cmd)
 
-def _parse_unix_traceroute(output: str, os_name: str) -> List[Dict[str, Any]]:
-    """Parse Unix traceroute output"""
-    hops = []
+def _parse_windows_line(line: str) -> Optional[Dict[str, Any]]:
+    """Parse one line of Windows tracert output, returning None if it is not a hop"""
+    match = _WIN_HOP_RE.match(line)
+    if not match:
+        return None
     
-    # Skip the header line
-    lines = output.splitlines()[1:]
+    hop_num = int(match.group(1))
     
-    for line in lines:
-        # Match hop number at the start of the line
-        hop_match = re.match(r'^\s*(\d+)\s+', line)
-        if not hop_match:
-            continue
-            
-        hop_num = int(hop_match.group(1))
-        
-        # Extract IP addresses or timeouts (*)
-        # Example patterns:
-        # macOS: "1  192.168.1.1 (192.168.1.1)  1.170 ms  1.018 ms  0.946 ms"
-        # Linux: "1  192.168.1.1  0.876 ms  0.875 ms  0.832 ms"
-        
-        # Find all IP addresses in parentheses (macOS) or without (Linux)
-        if os_name == 'darwin':
-            ip_pattern = r'\(([^\)]+)\)'
-        else:
-            ip_pattern = r'(\d+\.\d+\.\d+\.\d+)'
-            
-        ip_match = re.search(ip_pattern, line)
-        ip = ip_match.group(1) if ip_match else '*'
-        
-        # Find hostname (before the IP in parentheses on macOS)
-        hostname = ''
-        if os_name == 'darwin' and ip_match:
-            hostname_pattern = r'(\S+)\s+\(' + re.escape(ip) + r'\)'
-            hostname_match = re.search(hostname_pattern, line)
-            if hostname_match:
-                hostname = hostname_match.group(1)
-                # If hostname is an IP address, just leave it as IP
-                if re.match(r'^\d+\.\d+\.\d+\.\d+$', hostname):
-                    hostname = ''
-        
-        # Extract RTT values
-        rtt_pattern = r'(\d+\.\d+|\d+) ms'
-        rtt_values = [float(x) for x in re.findall(rtt_pattern, line)]
-        
-        hop_entry = {
-            'hop': hop_num,
-            'ip': ip,
-            'hostname': hostname,
-            'rtt': rtt_values
-        }
-        
-        hops.append(hop_entry)
+    # Extract RTTs
+    rtt_values = []
+    for i in range(2, 5):
+        rtt_str = match.group(i).strip()
+        if rtt_str != '*':
+            try:
+                # Extract just the number from strings like "14 ms" or "<1 ms";
+                # the hop pattern guarantees the "ms" suffix
+                rtt_value = float(rtt_str[:-2].strip().lstrip('<'))
+                rtt_values.append(rtt_value)
+            except ValueError:
+                pass
+    
+    # Get IP/hostname
+    ip_or_host = match.group(5)
+    
+    # Check if it's an IP address or hostname
+    is_ip = _is_ipv4(ip_or_host)
+    
+    return {
+        'hop': hop_num,
+        'ip': ip_or_host if is_ip or ip_or_host == '*' else '',
+        'hostname': '' if is_ip or ip_or_host == '*' else ip_or_host,
+        'rtt': rtt_values
+    }
+
+def _is_ipv4(token: str) -> bool:
+    """Check whether a token is a dotted-quad IPv4 address"""
+    # inet_aton does a real parse (rejecting e.g. 999.1.1.1) but also accepts
+    # shorthand forms like 127.1, hence the dot count
+    try:
+        socket.inet_aton(token)
+    except (OSError, ValueError):
+        return False
+    return token.count('.') == 3
+
+def _parse_unix_line(line: str, os_name: str) -> Optional[Dict[str, Any]]:
+    """Parse one line of Unix traceroute output, returning None if it is not a hop"""
+    # Unix traceroute lines are whitespace-separated tokens, e.g.
+    # macOS: "1  router.local (192.168.1.1)  1.170 ms  1.018 ms  0.946 ms"
+    # Linux: "1  192.168.1.1  0.876 ms  0.875 ms  0.832 ms"
+    # so a single split replaces the per-line pattern searches
+    tokens = line.split()
+    
+    # Lines of a hop start with the hop number
+    if len(tokens) < 2 or not tokens[0].isdigit():
+        return None
+    
+    hop_num = int(tokens[0])
+    
+    ip = '*'
+    hostname = ''
+    rtt_values = []
+    for i, token in enumerate(tokens[1:], 1):
+        if token == 'ms':
+            # The round-trip time precedes its unit
+            rtt = tokens[i - 1]
+            if rtt.replace('.', '', 1).isdigit():
+                rtt_values.append(float(rtt))
+        elif ip == '*':
+            if os_name == 'darwin':
+                # The first IP is in parentheses, after the hostname
+                if token.startswith('(') and token.endswith(')') and len(token) > 2:
+                    ip = token[1:-1]
+                    # If hostname is an IP address, just leave it as IP
+                    if not _is_ipv4(tokens[i - 1]):
+                        hostname = tokens[i - 1]
+            elif _is_ipv4(token):
+                ip = token
     
-    return hops
\ No newline at end of file
+    return {
+        'hop': hop_num,
+        'ip': ip,
+        'hostname': hostname,
+        'rtt': rtt_values
+    }
\ No newline at end of file